@@ -3,6 +3,7 @@
 """
 
 import sys
+import importlib.util
 
 print("=" * 60)
 print("Web Cloner - Status Check")
@@ -10,27 +11,31 @@ print("=" * 60)
 
 # 检查依赖
 print("\n[1] Checking dependencies...")
-try:
-    import playwright
-    import psutil
-    import colorama
-    import requests
-    from bs4 import BeautifulSoup
-    print("[OK] All dependencies installed")
-except ImportError as e:
-    print(f"[ERROR] Missing dependency: {e}")
+# 只检查模块是否存在，不执行模块代码（避免导入开销）
+missing = [
+    name for name in ["playwright", "psutil", "colorama", "aiohttp", "lxml", "bs4"]
+    if importlib.util.find_spec(name) is None
+]
+if missing:
+    print(f"[ERROR] Missing dependency: {', '.join(missing)}")
     print("Please run: pip install -r requirements.txt")
     sys.exit(1)
+print("[OK] All dependencies installed")
 
 # 检查模块
 print("\n[2] Checking modules...")
+# 模块在第 [4] 步使用时才导入，这里只确认模块文件存在
 try:
-    from src.thread_manager import get_thread_manager
-    from src.process_cleaner import get_process_cleaner
-    from src.memory_manager import get_memory_manager
-    from src.operation_middleware import get_middleware
-    from src.downloader import WebsiteDownloader
-    print("[OK] All modules loaded")
+    missing = [
+        name for name in [
+            "src.thread_manager", "src.process_cleaner", "src.memory_manager",
+            "src.operation_middleware", "src.downloader",
+        ]
+        if importlib.util.find_spec(name) is None
+    ]
+    if missing:
+        raise ImportError(f"module not found: {', '.join(missing)}")
+    print("[OK] All modules found")
 except Exception as e:
     print(f"[ERROR] Module load failed: {e}")
     sys.exit(1)
@@ -50,20 +55,24 @@ except Exception as e:
 print("\n[4] Checking managers...")
 try:
     # 线程管理器
+    from src.thread_manager import get_thread_manager
     tm = get_thread_manager()
     print(f"  - ThreadManager: OK (max_workers={tm.max_workers})")
 
     # 内存管理器
+    from src.memory_manager import get_memory_manager
     mm = get_memory_manager()
     mem_info = mm.get_current_memory_info()
     print(f"  - MemoryManager: OK (memory={mem_info.get('rss_mb', 0):.1f}MB)")
 
     # 进程清理器
+    from src.process_cleaner import get_process_cleaner
     pc = get_process_cleaner()
     browsers = pc.get_browser_processes()
     print(f"  - ProcessCleaner: OK (browsers={len(browsers)})")
 
     # 中间件
+    from src.operation_middleware import get_middleware
     mw = get_middleware()
     print(f"  - Middleware: OK")
 
@@ -4,18 +4,24 @@
 
 import os
 import logging
+import functools
+import types
 from pathlib import Path
+from typing import Set
 
 logger = logging.getLogger(__name__)
 
-# 项目根目录
-PROJECT_ROOT = Path(__file__).parent
+# 项目根目录（先用字符串拼接路径，每个目录只构造一次 Path）
+_ROOT_STR = os.path.dirname(os.path.abspath(__file__))
+_OUTPUT_STR = os.path.join(_ROOT_STR, "output")
+PROJECT_ROOT = Path(_ROOT_STR)
 
 # 输出目录配置
-OUTPUT_DIR = PROJECT_ROOT / "output"
-DOWNLOADS_DIR = OUTPUT_DIR / "downloads"
-PROJECTS_DIR = OUTPUT_DIR / "projects"
-REPORTS_DIR = OUTPUT_DIR / "reports"
+OUTPUT_DIR = Path(_OUTPUT_STR)
+DOWNLOADS_DIR = Path(os.path.join(_OUTPUT_STR, "downloads"))
+PROJECTS_DIR = Path(os.path.join(_OUTPUT_STR, "projects"))
+REPORTS_DIR = Path(os.path.join(_OUTPUT_STR, "reports"))
+CACHE_DIR = Path(os.path.join(_OUTPUT_STR, "cache"))  # 跨次运行复用的缓存（如资源 ETag/Last-Modified 缓存）
 
 # 浏览器配置
 BROWSER_CONFIG = {
@@ -37,6 +43,11 @@ DOWNLOAD_CONFIG = {
     "download_js": False,  # 不下载JS，生成纯静态页面
     "download_fonts": True,
     "follow_external_links": False,  # 不跟随外部链接
+    "concurrency": 8,  # 同时抓取的页面数
+    "browser_fetch": True,  # 同源资源在页面内用 fetch 批量下载（携带登录 Cookie）
+    "resource_cache": True,  # 缓存资源及 ETag/Last-Modified，重复下载时发送条件请求
+    "max_resources_per_page": 5000,  # 每个页面最多记录的网络响应数（只保留最近的）
+    "network_idle_cap": 8000,  # 抓取页面时等待网络空闲的上限（毫秒），超时后直接处理页面
     "wait_for_confirmation": True,  # 下载前等待用户确认页面是否正确
     "keep_ui_interactions": False,  # 移除所有JavaScript
     # 动态页面处理配置
@@ -50,6 +61,9 @@ DOWNLOAD_CONFIG = {
     }
 }
 
+# 默认运行配置（浏览器 + 下载配置合并，导入时构建一次，只读）
+DEFAULT_RUN_CONFIG = types.MappingProxyType({**BROWSER_CONFIG, **DOWNLOAD_CONFIG})
+
 # 技术栈检测配置
 TECH_DETECTION = {
     "frameworks": {
@@ -71,10 +85,13 @@ TECH_DETECTION = {
 AI_CONFIG = {
     "use_local_claude": True,  # 使用本地 Claude Code 进行分析
     "provider": "local_claude",
+    "enable_cache": True,  # 相同输入复用 REPORTS_DIR/.ai_cache 中的分析结果
+    "claude_bin": "claude",  # Claude CLI 可执行文件（未安装时使用本地分析）
+    "claude_timeout": 300,  # Claude CLI 调用超时（秒）
 }
 
 # 项目模板配置
-TEMPLATES_DIR = PROJECT_ROOT / "templates"
+TEMPLATES_DIR = Path(os.path.join(_ROOT_STR, "templates"))
 
 # 日志配置
 LOG_CONFIG = {
@@ -148,9 +165,9 @@ MONITORING_CONFIG = {
     "track_resource_usage": True,  # 追踪资源使用
 }
 
-# 确保目录存在
-def ensure_directories():
-    """确保所有必要的目录存在"""
+# 需要确保存在的目录（导入时计算一次）
+def _collect_required_directories():
+    """收集所有必要的目录"""
     directories = [
         OUTPUT_DIR, DOWNLOADS_DIR, PROJECTS_DIR, REPORTS_DIR, TEMPLATES_DIR
     ]
@@ -158,61 +175,95 @@ def ensure_directories():
     # 添加临时目录
     if PROCESS_CLEANUP_CONFIG.get("cleanup_temp_files", True):
         for temp_dir in PROCESS_CLEANUP_CONFIG.get("temp_cleanup_dirs", []):
-            directories.append(PROJECT_ROOT / temp_dir)
+            directories.append(Path(os.path.join(_ROOT_STR, temp_dir)))
+
+    return [directory for directory in directories if directory]
 
-    for directory in directories:
-        if directory:
+
+_REQUIRED_DIRS = _collect_required_directories()
+
+# 已创建过的目录，后续调用不再重复 mkdir
+_ENSURED_DIRS: Set[Path] = set()
+
+
+# 确保目录存在
+def ensure_directories():
+    """确保所有必要的目录存在"""
+    for directory in _REQUIRED_DIRS:
+        if directory in _ENSURED_DIRS:
+            continue
+        # 已存在的目录只需一次 stat，无需 mkdir
+        if not directory.is_dir():
             directory.mkdir(parents=True, exist_ok=True)
+        _ENSURED_DIRS.add(directory)
 
 
 # 验证配置
 def validate_config():
     """验证配置参数的有效性"""
+    # 配置内容不变时直接命中缓存，跳过重复校验
+    _validate_frozen(
+        tuple(sorted(THREAD_CONFIG.items())),
+        tuple(sorted(MEMORY_CONFIG.items())),
+        tuple(sorted(PERFORMANCE_CONFIG.items()))
+    )
+
+    logger.info("配置验证通过")
+
+
+@functools.lru_cache(maxsize=4)
+def _validate_frozen(thread_items: tuple, memory_items: tuple, perf_items: tuple) -> None:
+    """按配置内容缓存的校验实现（校验失败时抛出异常，不会被缓存）"""
+    thread_config = dict(thread_items)
+    memory_config = dict(memory_items)
+    performance_config = dict(perf_items)
     errors = []
 
     # 验证线程配置
-    if THREAD_CONFIG["max_workers"] <= 0:
+    if thread_config["max_workers"] <= 0:
         errors.append("THREAD_CONFIG.max_workers 必须大于 0")
 
-    if THREAD_CONFIG["task_timeout"] <= 0:
+    if thread_config["task_timeout"] <= 0:
         errors.append("THREAD_CONFIG.task_timeout 必须大于 0")
 
     # 验证内存配置
-    if not (0 < MEMORY_CONFIG["warning_percent"] < 100):
+    if not (0 < memory_config["warning_percent"] < 100):
         errors.append("MEMORY_CONFIG.warning_percent 必须在 0-100 之间")
 
-    if not (0 < MEMORY_CONFIG["critical_percent"] < 100):
+    if not (0 < memory_config["critical_percent"] < 100):
         errors.append("MEMORY_CONFIG.critical_percent 必须在 0-100 之间")
 
-    if MEMORY_CONFIG["critical_percent"] <= MEMORY_CONFIG["warning_percent"]:
+    if memory_config["critical_percent"] <= memory_config["warning_percent"]:
         errors.append("MEMORY_CONFIG.critical_percent 必须大于 warning_percent")
 
     # 验证性能配置
-    if PERFORMANCE_CONFIG["parallel_resource_downloads"] <= 0:
+    if performance_config["parallel_resource_downloads"] <= 0:
         errors.append("PERFORMANCE_CONFIG.parallel_resource_downloads 必须大于 0")
 
-    if PERFORMANCE_CONFIG["chunk_size"] <= 0:
+    if performance_config["chunk_size"] <= 0:
         errors.append("PERFORMANCE_CONFIG.chunk_size 必须大于 0")
 
     if errors:
         raise ValueError("配置验证失败:\n" + "\n".join(f"  - {error}" for error in errors))
 
-    logger.info("配置验证通过")
+
+# 完整配置（导入时构建一次，只读视图）
+_FULL_CONFIG = types.MappingProxyType({
+    "browser": BROWSER_CONFIG,
+    "download": DOWNLOAD_CONFIG,
+    "thread": THREAD_CONFIG,
+    "process_cleanup": PROCESS_CLEANUP_CONFIG,
+    "memory": MEMORY_CONFIG,
+    "middleware": MIDDLEWARE_CONFIG,
+    "performance": PERFORMANCE_CONFIG,
+    "monitoring": MONITORING_CONFIG,
+    "tech_detection": TECH_DETECTION,
+    "ai": AI_CONFIG,
+    "log": LOG_CONFIG
+})
 
 
 # 获取完整配置
 def get_full_config():
-    """获取完整的配置字典"""
-    return {
-        "browser": BROWSER_CONFIG,
-        "download": DOWNLOAD_CONFIG,
-        "thread": THREAD_CONFIG,
-        "process_cleanup": PROCESS_CLEANUP_CONFIG,
-        "memory": MEMORY_CONFIG,
-        "middleware": MIDDLEWARE_CONFIG,
-        "performance": PERFORMANCE_CONFIG,
-        "monitoring": MONITORING_CONFIG,
-        "tech_detection": TECH_DETECTION,
-        "ai": AI_CONFIG,
-        "log": LOG_CONFIG
-    }
+    """获取完整的配置（只读映射）"""
+    return _FULL_CONFIG
@@ -5,22 +5,19 @@
 import asyncio
 from pathlib import Path
 
-# 导入模块
-from src.downloader import download_website
-from src.detector import detect_tech_stack
-from src.reconstructor import reconstruct_project
-from src.ai_analyzer import analyze_with_ai
-from config import BROWSER_CONFIG, DOWNLOAD_CONFIG, AI_CONFIG
-
 
 async def example_1_basic_download():
     """示例 1: 基本下载"""
     print("=== 示例 1: 基本下载 ===\n")
 
+    # 在函数内导入，只加载当前示例需要的模块
+    from src.downloader import download_website
+    from config import DEFAULT_RUN_CONFIG
+
     url = "https://example.com"
     output_dir = Path("./output/example1")
 
-    config = {**BROWSER_CONFIG, **DOWNLOAD_CONFIG}
+    config = DEFAULT_RUN_CONFIG
 
     report = await download_website(url, output_dir, config)
 
@@ -34,6 +31,8 @@ def example_2_detect_tech_stack():
     """示例 2: 检测技术栈"""
     print("\n=== 示例 2: 检测技术栈 ===\n")
 
+    from src.detector import detect_tech_stack
+
     directory = Path("./output/example1")
 
     if not directory.exists():
@@ -51,6 +50,12 @@ def example_3_full_workflow():
     """示例 3: 完整工作流"""
     print("\n=== 示例 3: 完整工作流 ===\n")
 
+    from src.downloader import download_website
+    from src.detector import detect_tech_stack
+    from src.reconstructor import reconstruct_project
+    from src.ai_analyzer import analyze_with_ai_async
+    from config import DEFAULT_RUN_CONFIG, AI_CONFIG
+
     async def run():
         url = "https://example.com"
         download_dir = Path("./output/example3/downloads")
@@ -58,7 +63,7 @@ def example_3_full_workflow():
 
         # 1. 下载网站
         print("步骤 1: 下载网站...")
-        config = {**BROWSER_CONFIG, **DOWNLOAD_CONFIG}
+        config = DEFAULT_RUN_CONFIG
         download_report = await download_website(url, download_dir, config)
         print(f"  ✓ 下载完成: {download_report['statistics']['total_files']} 个文件\n")
 
@@ -74,7 +79,7 @@ def example_3_full_workflow():
 
         # 4. AI 分析 (可选)
         print("步骤 4: AI 分析...")
-        ai_report = analyze_with_ai(download_report, tech_report, project_report, AI_CONFIG)
+        ai_report = await analyze_with_ai_async(download_report, tech_report, project_report, AI_CONFIG)
 
         if ai_report['ai_enabled']:
             print(f"  ✓ AI 分析完成")
@@ -93,6 +98,9 @@ def example_4_custom_config():
     """示例 4: 自定义配置"""
     print("\n=== 示例 4: 自定义配置 ===\n")
 
+    from src.downloader import download_website
+    from config import DEFAULT_RUN_CONFIG
+
     async def run():
         url = "https://example.com"
         output_dir = Path("./output/example4")
@@ -107,7 +115,8 @@ def example_4_custom_config():
             'timeout': 60000  # 60秒超时
         }
 
-        report = await download_website(url, output_dir, custom_config)
+        config = {**DEFAULT_RUN_CONFIG, **custom_config}
+        report = await download_website(url, output_dir, config)
 
         print(f"自定义下载完成!")
         print(f"  页面数: {report['statistics']['pages_downloaded']}")
@@ -115,27 +124,47 @@ def example_4_custom_config():
     asyncio.run(run())
 
 
-if __name__ == '__main__':
-    import sys
+# 示例表: 编号 -> (名称, 函数名, 是否为协程函数)
+EXAMPLES = {
+    1: ('基本下载', 'example_1_basic_download', True),
+    2: ('检测技术栈', 'example_2_detect_tech_stack', False),
+    3: ('完整工作流', 'example_3_full_workflow', False),
+    4: ('自定义配置', 'example_4_custom_config', False)
+}
+
 
-    examples = {
-        '1': ('基本下载', example_1_basic_download),
-        '2': ('检测技术栈', example_2_detect_tech_stack),
-        '3': ('完整工作流', example_3_full_workflow),
-        '4': ('自定义配置', example_4_custom_config)
-    }
+def main():
+    """解析命令行参数并运行选中的示例"""
+    import argparse
 
-    print("可用示例:")
-    for key, (name, _) in examples.items():
-        print(f"  {key}. {name}")
+    parser = argparse.ArgumentParser(description='网站复刻工具使用示例')
+    parser.add_argument('--example', '-e', type=int, choices=sorted(EXAMPLES),
+                        help='要运行的示例编号 (不指定则交互选择)')
+    args = parser.parse_args()
 
-    choice = input("\n请选择示例 (1-4): ").strip()
+    choice = args.example
+    if choice is None:
+        print("可用示例:")
+        for key, (name, _, _) in EXAMPLES.items():
+            print(f"  {key}. {name}")
 
-    if choice in examples:
-        name, func = examples[choice]
-        if asyncio.iscoroutinefunction(func):
+        answer = input("\n请选择示例 (1-4): ").strip()
+        choice = int(answer) if answer.isdigit() else None
+
+    if choice not in EXAMPLES:
+        print("无效选择!")
+        return
+
+    # 只取出选中的示例函数，其依赖在函数内部导入
+    _, func_name, is_async = EXAMPLES[choice]
+    func = globals()[func_name]
+
+    match is_async:
+        case True:
             asyncio.run(func())
-        else:
+        case False:
             func()
-    else:
-        print("无效选择!")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,11 +2,19 @@
 自动安装脚本 - 跨平台 Python 安装工具
 """
 
+import os
 import sys
+import shutil
 import subprocess
 import platform
+import importlib.util
+import py_compile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# 项目根目录
+PROJECT_ROOT = Path(__file__).parent
+
 
 def print_header():
     """打印标题"""
@@ -32,20 +40,19 @@ def check_python_version():
 
 def check_uv_installed():
     """检查 uv 是否已安装"""
-    try:
-        subprocess.run(
-            ["uv", "--version"],
-            check=True,
-            capture_output=True
-        )
-        return True
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        return False
+    # 只在 PATH 中查找可执行文件，无需启动 uv 进程
+    return shutil.which("uv") is not None
 
 
 def install_uv():
-    """安装 uv"""
+    """安装 uv (优先使用官方独立安装脚本，失败时回退到 pip)"""
     print("\n📦 安装 uv (超快速 Python 包管理器)...")
+
+    if install_uv_standalone():
+        print("   ✓ uv 安装成功\n")
+        return True
+
+    print("   ⚠️ 独立安装脚本失败,改用 pip 安装...")
     try:
         subprocess.run(
             [sys.executable, "-m", "pip", "install", "uv"],
@@ -59,6 +66,29 @@ def install_uv():
         return False
 
 
+def install_uv_standalone():
+    """使用官方独立安装脚本安装 uv (直接下载二进制，无需启动 pip)"""
+    if platform.system() == "Windows":
+        command = [
+            "powershell", "-ExecutionPolicy", "ByPass", "-c",
+            "irm https://astral.sh/uv/install.ps1 | iex"
+        ]
+    else:
+        command = ["sh", "-c", "curl -LsSf https://astral.sh/uv/install.sh | sh"]
+
+    try:
+        subprocess.run(command, check=True)
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return False
+
+    # 安装脚本默认安装到 ~/.local/bin，当前进程的 PATH 中可能还没有
+    install_dir = Path.home() / ".local" / "bin"
+    if not check_uv_installed() and install_dir.exists():
+        os.environ["PATH"] = str(install_dir) + os.pathsep + os.environ.get("PATH", "")
+
+    return check_uv_installed()
+
+
 def install_dependencies():
     """使用 uv 安装项目依赖"""
     print("📚 安装项目依赖 (使用 uv 超快速安装)...")
@@ -102,22 +132,49 @@ def verify_installation():
     """验证安装"""
     print("🔍 验证安装...")
 
-    try:
-        result = subprocess.run(
-            [sys.executable, "main.py", "--version"],
-            check=True,
-            capture_output=True,
-            text=True
-        )
-        print("   ✓ 安装验证成功\n")
-        return True
+    main_path = PROJECT_ROOT / "main.py"
+    if not main_path.exists():
+        print("   ⚠️ main.py 未找到,请确认在项目目录中运行\n")
+        return False
 
-    except subprocess.CalledProcessError:
+    # 在当前进程中检查模块可加载，无需再启动一个 Python 解释器
+    spec = importlib.util.spec_from_file_location("main", main_path)
+    if spec is None or importlib.util.find_spec("click") is None:
         print("   ⚠️ 验证失败,但可能可以正常使用\n")
         return False
-    except FileNotFoundError:
-        print("   ⚠️ main.py 未找到,请确认在项目目录中运行\n")
-        return False
+
+    print("   ✓ 安装验证成功\n")
+    return True
+
+
+def precompile_bytecode():
+    """预编译项目字节码，避免首次运行时编译 .py 文件
+
+    单个文件编译失败（如语法错误）不影响其余文件，失败的文件单独列出，运行时照常按需编译。
+    """
+    print("⚙️ 预编译字节码...")
+
+    sources = sorted((PROJECT_ROOT / "src").rglob("*.py"))
+    sources += [PROJECT_ROOT / "main.py", PROJECT_ROOT / "config.py"]
+
+    compiled, skipped = 0, []
+    for source in sources:
+        try:
+            # checked-hash 模式: 源文件修改后缓存会自动失效
+            py_compile.compile(
+                str(source),
+                doraise=True,
+                invalidation_mode=py_compile.PycInvalidationMode.CHECKED_HASH
+            )
+            compiled += 1
+        except (py_compile.PyCompileError, OSError):
+            skipped.append(source.relative_to(PROJECT_ROOT).as_posix())
+
+    print(f"   ✓ 字节码预编译完成 ({compiled} 个文件)")
+    if skipped:
+        print(f"   ℹ️ 跳过无法预编译的文件(运行时按需编译): {', '.join(skipped)}")
+    print()
+    return not skipped
 
 
 def print_next_steps():
@@ -158,19 +215,34 @@ def main():
     else:
         print("✓ uv 已安装\n")
 
-    # 安装依赖
-    if not install_dependencies():
+    # 安装依赖和 Playwright 浏览器
+    # playwright 包已存在时两者互不依赖，并行执行以重叠网络下载
+    if importlib.util.find_spec("playwright") is not None:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            deps_future = executor.submit(install_dependencies)
+            playwright_future = executor.submit(install_playwright)
+            deps_ok = deps_future.result()
+            playwright_ok = playwright_future.result()
+    else:
+        # 首次安装: 浏览器下载依赖 playwright 包，只能串行
+        deps_ok = install_dependencies()
+        playwright_ok = install_playwright() if deps_ok else False
+
+    if not deps_ok:
         print("\n请检查错误信息并重试")
         sys.exit(1)
 
-    # 安装 Playwright
-    if not install_playwright():
+    # 检查 Playwright 安装结果
+    if not playwright_ok:
         print("\n⚠️ Playwright 安装失败,但其他功能可能可以使用")
         print("   可以稍后手动安装: python -m playwright install chromium")
 
     # 验证安装
     verify_installation()
 
+    # 预编译字节码
+    precompile_bytecode()
+
     # 打印下一步操作
     print_next_steps()
 
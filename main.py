@@ -8,6 +8,9 @@ import os
 from pathlib import Path
 from datetime import datetime
 import logging
+from collections import ChainMap
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
 
 # 设置 Windows 控制台编码为 UTF-8
 if sys.platform == 'win32':
@@ -20,8 +23,7 @@ if sys.platform == 'win32':
         pass
 
 import click
-from colorama import init, Fore, Style
-from tqdm import tqdm
+from colorama import init, Fore, Back, Style
 
 # 导入配置
 from config import (
@@ -41,23 +43,31 @@ from config import (
     PERFORMANCE_CONFIG
 )
 
-# 导入核心模块
-from src.downloader import download_website
-from src.detector import detect_tech_stack
-from src.reconstructor import reconstruct_project
-from src.ai_analyzer import analyze_with_ai
+# 核心模块（playwright、bs4 等较重）在各命令内部按需导入
 from src.utils import setup_logger, save_json
 
+
+def _disable_colors():
+    """将 colorama 的颜色常量置为空字符串（所有模块共享同一组常量对象）"""
+    for codes in (Fore, Back, Style):
+        for name in dir(codes):
+            if not name.startswith('_'):
+                setattr(codes, name, '')
+
+
 # 初始化
-init(autoreset=True)  # colorama
+# 仅在交互式终端中启用 colorama；非 TTY 或设置了 NO_COLOR 时不包装输出流，直接输出无颜色文本
+if sys.stdout.isatty() and not os.environ.get('NO_COLOR'):
+    init(autoreset=True)  # colorama
+else:
+    _disable_colors()
 ensure_directories()
 
 logger = setup_logger('main', LOG_CONFIG['level'])
 
 
-def print_banner():
-    """打印程序横幅"""
-    banner = f"""
+# 程序横幅（导入时构建一次）
+_BANNER = f"""
 {Fore.CYAN}╔═══════════════════════════════════════════════════════╗
 ║                                                       ║
 ║          网站一比一复刻工具                           ║
@@ -65,8 +75,55 @@ def print_banner():
 ║     一键复刻任何网站,自动检测技术栈,生成项目         ║
 ║                                                       ║
 ╚═══════════════════════════════════════════════════════╝{Style.RESET_ALL}
+
+"""
+
+
+# info 命令的静态说明文本（导入时构建一次）
+_INFO_TEXT = f"""
+{Fore.CYAN}工具信息:{Style.RESET_ALL}
+
+名称: 网站一比一复刻工具
+版本: 1.0.0
+作者: Claude Code
+描述: 自动复刻网站,检测技术栈,生成可运行项目
+
+{Fore.CYAN}核心功能:{Style.RESET_ALL}
+  - 使用 Playwright 完整渲染和下载网站
+  - 智能检测前端框架、UI库、构建工具
+  - 自动生成 React/Vue/Next.js 等项目结构
+  - AI 辅助分析和优化建议
+
+{Fore.CYAN}支持的框架:{Style.RESET_ALL}
+  - React (+ Next.js)
+  - Vue.js (+ Nuxt.js)
+  - Angular
+  - 静态网站
+
+{Fore.CYAN}使用示例:{Style.RESET_ALL}
+  # 完整复刻
+  python main.py clone https://example.com
+
+  # 启用 AI 分析
+  python main.py clone https://example.com --enable-ai
+
+  # 仅下载资源
+  python main.py download https://example.com -o ./output
+
+  # 检测技术栈
+  python main.py detect ./downloaded-site
 """
-    print(banner)
+
+
+def _ensure(path: Path) -> None:
+    """确保目录存在（已存在时只做一次 stat）"""
+    if not path.is_dir():
+        path.mkdir(parents=True, exist_ok=True)
+
+
+def print_banner():
+    """打印程序横幅（单次写入）"""
+    sys.stdout.write(_BANNER)
 
 
 @click.group()
@@ -91,7 +148,8 @@ def cli():
 @click.option('--chrome-mode', type=click.Choice(['system', 'playwright']), default='playwright', help='Chrome 数据模式: system(需关闭Chrome)/playwright(项目根目录数据)')
 @click.option('--use-browser-data', is_flag=True, help='使用系统浏览器数据(登录状态、Cookies等)')
 @click.option('--static-only', is_flag=True, help='强制生成纯静态项目(仅HTML+CSS,移除所有JS)')
-def clone(url, output, max_depth, max_pages, no_images, no_css, no_js, enable_ai, headless, confirm, chrome_data_dir, chrome_mode, use_browser_data, static_only):
+@click.option('--concurrency', '-c', default=8, type=click.IntRange(min=1), help='同时抓取的页面数')
+def clone(url, output, max_depth, max_pages, no_images, no_css, no_js, enable_ai, headless, confirm, chrome_data_dir, chrome_mode, use_browser_data, static_only, concurrency):
     """
     完整复刻网站
 
@@ -103,7 +161,8 @@ def clone(url, output, max_depth, max_pages, no_images, no_css, no_js, enable_ai
 
     # 生成输出目录名
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    domain = url.split('//')[-1].split('/')[0].replace(':', '_')
+    parsed = urlsplit(url)
+    domain = (parsed.netloc or parsed.path.split('/', 1)[0]).replace(':', '_')
     output_name = output or f"{domain}_{timestamp}"
 
     download_dir = DOWNLOADS_DIR / output_name
@@ -118,23 +177,26 @@ def clone(url, output, max_depth, max_pages, no_images, no_css, no_js, enable_ai
         sys.exit(1)
 
     # 配置下载选项
-    config = DOWNLOAD_CONFIG.copy()
-    config.update(BROWSER_CONFIG)
-    config['max_depth'] = max_depth
-    config['max_pages'] = max_pages
-    config['download_images'] = not no_images
-    config['download_css'] = not no_css
-    config['download_js'] = not no_js
-    config['headless'] = headless
-    config['wait_for_confirmation'] = confirm
-    config['chrome_mode'] = chrome_mode
-
-    # 添加新的管理配置
-    config['thread'] = THREAD_CONFIG.copy()
-    config['process_cleanup'] = PROCESS_CLEANUP_CONFIG.copy()
-    config['memory'] = MEMORY_CONFIG.copy()
-    config['middleware'] = MIDDLEWARE_CONFIG.copy()
-    config['performance'] = PERFORMANCE_CONFIG.copy()
+    # 命令行覆盖项放在 ChainMap 最前面，其余键直接读取全局配置（无需复制）
+    overrides = {
+        'max_depth': max_depth,
+        'max_pages': max_pages,
+        'concurrency': concurrency,
+        'download_images': not no_images,
+        'download_css': not no_css,
+        'download_js': not no_js,
+        'headless': headless,
+        'wait_for_confirmation': confirm,
+        'chrome_mode': chrome_mode,
+
+        # 添加新的管理配置
+        'thread': THREAD_CONFIG,
+        'process_cleanup': PROCESS_CLEANUP_CONFIG,
+        'memory': MEMORY_CONFIG,
+        'middleware': MIDDLEWARE_CONFIG,
+        'performance': PERFORMANCE_CONFIG,
+    }
+    config = ChainMap(overrides, BROWSER_CONFIG, DOWNLOAD_CONFIG)
 
     # 浏览器数据共享逻辑
     if use_browser_data:
@@ -170,108 +232,148 @@ def clone(url, output, max_depth, max_pages, no_images, no_css, no_js, enable_ai
         click.echo(f"{Fore.CYAN}[提示] 浏览器将打开目标页面，请确认页面正确后继续{Style.RESET_ALL}")
     click.echo()
 
+    # 报告写盘线程池，整个复刻流程共享
+    report_writer = ThreadPoolExecutor(max_workers=4, thread_name_prefix="ReportWriter-")
+
     try:
-        # 第一步:下载网站
-        click.echo(f"{Fore.YELLOW}[1/4] 下载网站资源...{Style.RESET_ALL}")
-        download_report = asyncio.run(download_website(url, download_dir, config))
+        asyncio.run(_run_clone_pipeline(
+            url, download_dir, project_dir, report_dir, config, static_only, enable_ai, report_writer
+        ))
 
-        # 检查用户是否取消
-        if not download_report:
-            click.echo(f"\n{Fore.YELLOW}[取消] 用户取消了下载操作{Style.RESET_ALL}\n")
-            return
+    except Exception as e:
+        click.echo(f"\n{Fore.RED}[ERROR] 错误: {e}{Style.RESET_ALL}\n")
+        logger.exception("复刻过程中发生错误")
+        sys.exit(1)
 
-        # 创建项目目录（只在确认下载后创建）
-        project_dir.mkdir(parents=True, exist_ok=True)
-        report_dir.mkdir(parents=True, exist_ok=True)
+    finally:
+        report_writer.shutdown(wait=True)
+
+
+async def _run_clone_pipeline(url, download_dir, project_dir, report_dir, config, static_only, enable_ai,
+                              report_writer):
+    """复刻流水线: 在同一个事件循环中执行各阶段，报告写盘与下一阶段并行"""
+    from src.downloader import download_website
+    from src.detector import detect_tech_stack
+    from src.reconstructor import reconstruct_project
+
+    # 第一步:下载网站
+    click.echo(f"{Fore.YELLOW}[1/4] 下载网站资源...{Style.RESET_ALL}")
+    download_report = await download_website(url, download_dir, config)
+
+    # 检查用户是否取消
+    if not download_report:
+        click.echo(f"\n{Fore.YELLOW}[取消] 用户取消了下载操作{Style.RESET_ALL}\n")
+        return
+
+    # 创建项目目录（只在确认下载后创建）
+    _ensure(project_dir)
+    _ensure(report_dir)
+
+    # 统计错误类型
+    failed_downloads = download_report.get('failed_downloads', [])
+    critical_errors = skipped_resources = 0
+    for failure in failed_downloads:
+        severity = failure.get('severity')
+        if severity == 'info':
+            skipped_resources += 1
+        elif severity in ('warning', 'error'):
+            critical_errors += 1
+
+    # 生成下载报告
+    total_files = download_report['statistics']['total_files']
+    report_parts = [f"下载完成: {total_files} 个文件"]
+
+    if skipped_resources:
+        report_parts.append(f"已跳过 {skipped_resources} 个无效资源")
+
+    if critical_errors:
+        # 只有真正的错误才显示警告
+        click.echo(
+            f"{Fore.YELLOW}[OK] {', '.join(report_parts)}{Style.RESET_ALL}\n"
+            f"{Fore.YELLOW}[!] 警告: {critical_errors} 个资源下载失败{Style.RESET_ALL}\n"
+        )
+    else:
+        click.echo(f"{Fore.GREEN}[OK] {', '.join(report_parts)}{Style.RESET_ALL}\n")
 
-        # 保存下载报告
-        save_json(download_report, report_dir / 'download_report.json')
+    # 报告写盘提交到共享线程池，不阻塞后续阶段
+    pending_writes = [report_writer.submit(save_json, download_report, report_dir / 'download_report.json')]
 
-        # 统计错误类型
-        failed_downloads = download_report.get('failed_downloads', [])
-        critical_errors = [f for f in failed_downloads if f.get('severity') in ('warning', 'error')]
-        skipped_resources = [f for f in failed_downloads if f.get('severity') == 'info']
+    # 第二步:检测技术栈
+    click.echo(f"{Fore.YELLOW}[2/4] 检测技术栈...{Style.RESET_ALL}")
+    tech_report = await asyncio.to_thread(detect_tech_stack, download_dir)
 
-        # 生成下载报告
-        total_files = download_report['statistics']['total_files']
-        report_parts = [f"下载完成: {total_files} 个文件"]
+    # 保存技术栈报告
+    pending_writes.append(report_writer.submit(save_json, tech_report, report_dir / 'tech_report.json'))
 
-        if skipped_resources:
-            report_parts.append(f"已跳过 {len(skipped_resources)} 个无效资源")
+    detected_count = tech_report['summary']['total_technologies']
+    click.echo(f"{Fore.GREEN}[OK] 检测到 {detected_count} 项技术{Style.RESET_ALL}\n")
 
-        if critical_errors:
-            # 只有真正的错误才显示警告
-            click.echo(f"{Fore.YELLOW}[OK] {', '.join(report_parts)}{Style.RESET_ALL}")
-            click.echo(f"{Fore.YELLOW}[!] 警告: {len(critical_errors)} 个资源下载失败{Style.RESET_ALL}\n")
-        else:
-            click.echo(f"{Fore.GREEN}[OK] {', '.join(report_parts)}{Style.RESET_ALL}\n")
+    # 打印检测到的技术
+    if tech_report['detected_technologies']:
+        click.echo(_format_detected_technologies(tech_report['detected_technologies']))
 
-        # 第二步:检测技术栈
-        click.echo(f"{Fore.YELLOW}[2/4] 检测技术栈...{Style.RESET_ALL}")
-        tech_report = detect_tech_stack(download_dir)
+    # 第三步:重构项目
+    click.echo(f"{Fore.YELLOW}[3/4] 重构并生成项目...{Style.RESET_ALL}")
+    if static_only:
+        click.echo(f"{Fore.CYAN}  → 使用 --static-only 模式,将生成纯静态项目(仅HTML+CSS){Style.RESET_ALL}")
+    project_report = await asyncio.to_thread(
+        reconstruct_project, download_dir, project_dir, tech_report, force_static=static_only
+    )
 
-        # 保存技术栈报告
-        save_json(tech_report, report_dir / 'tech_report.json')
+    # 保存项目报告
+    pending_writes.append(report_writer.submit(save_json, project_report, report_dir / 'project_report.json'))
+    click.echo(f"{Fore.GREEN}[OK] 项目生成完成: {project_report['project_type']}{Style.RESET_ALL}\n")
 
-        detected_count = tech_report['summary']['total_technologies']
-        click.echo(f"{Fore.GREEN}[OK] 检测到 {detected_count} 项技术{Style.RESET_ALL}\n")
+    # 第四步:AI 辅助分析 (可选)
+    if enable_ai:
+        from src.ai_analyzer import analyze_with_ai_async
 
-        # 打印检测到的技术
-        if tech_report['detected_technologies']:
-            click.echo(f"{Fore.CYAN}检测到的技术栈:{Style.RESET_ALL}")
-            for category, techs in tech_report['detected_technologies'].items():
-                click.echo(f"  - {category}: {', '.join(techs)}")
-            click.echo()
-
-        # 第三步:重构项目
-        click.echo(f"{Fore.YELLOW}[3/4] 重构并生成项目...{Style.RESET_ALL}")
-        if static_only:
-            click.echo(f"{Fore.CYAN}  → 使用 --static-only 模式,将生成纯静态项目(仅HTML+CSS){Style.RESET_ALL}")
-        project_report = reconstruct_project(download_dir, project_dir, tech_report, force_static=static_only)
-
-        # 保存项目报告
-        save_json(project_report, report_dir / 'project_report.json')
-        click.echo(f"{Fore.GREEN}[OK] 项目生成完成: {project_report['project_type']}{Style.RESET_ALL}\n")
-
-        # 第四步:AI 辅助分析 (可选)
-        if enable_ai:
-            click.echo(f"{Fore.YELLOW}[4/4] AI 辅助分析...{Style.RESET_ALL}")
-            ai_report = analyze_with_ai(download_report, tech_report, project_report, AI_CONFIG)
-
-            # 保存 AI 分析报告
-            save_json(ai_report, report_dir / 'ai_analysis.json')
-
-            if ai_report['ai_enabled']:
-                click.echo(f"{Fore.GREEN}[OK] AI 分析完成{Style.RESET_ALL}\n")
+        click.echo(f"{Fore.YELLOW}[4/4] AI 辅助分析...{Style.RESET_ALL}")
+        ai_report = await analyze_with_ai_async(download_report, tech_report, project_report, AI_CONFIG)
 
-                # 打印建议
-                suggestions = ai_report['analysis'].get('suggestions', [])
-                if suggestions:
-                    click.echo(f"{Fore.CYAN}AI 建议:{Style.RESET_ALL}")
-                    for i, suggestion in enumerate(suggestions[:10], 1):
-                        click.echo(f"  {i}. {suggestion}")
-                    click.echo()
+        # 保存 AI 分析报告
+        pending_writes.append(report_writer.submit(save_json, ai_report, report_dir / 'ai_analysis.json'))
+
+        if ai_report['ai_enabled']:
+            if ai_report['analysis'].get('fallback'):
+                click.echo(f"{Fore.YELLOW}[OK] Claude CLI 不可用，使用本地模板分析{Style.RESET_ALL}\n")
             else:
-                click.echo(f"{Fore.YELLOW}[OK] 使用规则引擎分析{Style.RESET_ALL}\n")
+                click.echo(f"{Fore.GREEN}[OK] AI 分析完成{Style.RESET_ALL}\n")
 
-        # 打印总结
-        click.echo(f"\n{Fore.GREEN}{'='*60}{Style.RESET_ALL}")
-        click.echo(f"{Fore.GREEN}[SUCCESS] 复刻完成!{Style.RESET_ALL}\n")
-        click.echo(f"{Fore.CYAN}下载目录:{Style.RESET_ALL} {download_dir}")
-        click.echo(f"{Fore.CYAN}项目目录:{Style.RESET_ALL} {project_dir}")
-        click.echo(f"{Fore.CYAN}报告目录:{Style.RESET_ALL} {report_dir}")
+            # 打印建议
+            suggestions = ai_report['analysis'].get('suggestions', [])
+            if suggestions:
+                lines = [f"{Fore.CYAN}AI 建议:{Style.RESET_ALL}"]
+                lines.extend(f"  {i}. {suggestion}" for i, suggestion in enumerate(suggestions[:10], 1))
+                click.echo("\n".join(lines) + "\n")
+        else:
+            click.echo(f"{Fore.YELLOW}[OK] 使用规则引擎分析{Style.RESET_ALL}\n")
 
-        # 打印下一步操作
-        click.echo(f"\n{Fore.YELLOW}下一步操作:{Style.RESET_ALL}")
-        for step in project_report['next_steps']:
-            click.echo(f"  {step}")
+    # 等待所有报告写入完成（写入失败时抛出异常）
+    await asyncio.gather(*(asyncio.wrap_future(future) for future in pending_writes))
 
-        click.echo(f"\n{Fore.GREEN}{'='*60}{Style.RESET_ALL}\n")
+    # 打印总结（合并为一次输出）
+    lines = [
+        f"\n{Fore.GREEN}{'='*60}{Style.RESET_ALL}",
+        f"{Fore.GREEN}[SUCCESS] 复刻完成!{Style.RESET_ALL}\n",
+        f"{Fore.CYAN}下载目录:{Style.RESET_ALL} {download_dir}",
+        f"{Fore.CYAN}项目目录:{Style.RESET_ALL} {project_dir}",
+        f"{Fore.CYAN}报告目录:{Style.RESET_ALL} {report_dir}",
+    ]
 
-    except Exception as e:
-        click.echo(f"\n{Fore.RED}[ERROR] 错误: {e}{Style.RESET_ALL}\n")
-        logger.exception("复刻过程中发生错误")
-        sys.exit(1)
+    # 打印下一步操作
+    lines.append(f"\n{Fore.YELLOW}下一步操作:{Style.RESET_ALL}")
+    lines.extend(f"  {step}" for step in project_report['next_steps'])
+
+    lines.append(f"\n{Fore.GREEN}{'='*60}{Style.RESET_ALL}\n")
+    click.echo("\n".join(lines))
+
+
+def _format_detected_technologies(detected: dict) -> str:
+    """将检测到的技术栈格式化为一段文本（一次输出）"""
+    lines = [f"{Fore.CYAN}检测到的技术栈:{Style.RESET_ALL}"]
+    lines.extend(f"  - {category}: {', '.join(techs)}" for category, techs in detected.items())
+    return "\n".join(lines) + "\n"
 
 
 @cli.command()
@@ -286,6 +388,8 @@ def detect(directory):
 
     click.echo(f"\n{Fore.GREEN}▶ 检测技术栈: {Fore.CYAN}{directory}{Style.RESET_ALL}\n")
 
+    from src.detector import detect_tech_stack
+
     try:
         tech_report = detect_tech_stack(Path(directory))
 
@@ -294,10 +398,7 @@ def detect(directory):
 
         # 打印检测到的技术
         if tech_report['detected_technologies']:
-            click.echo(f"{Fore.CYAN}检测到的技术栈:{Style.RESET_ALL}")
-            for category, techs in tech_report['detected_technologies'].items():
-                click.echo(f"  - {category}: {', '.join(techs)}")
-            click.echo()
+            click.echo(_format_detected_technologies(tech_report['detected_technologies']))
 
         # 打印推荐
         if tech_report.get('recommendations'):
@@ -313,7 +414,8 @@ def detect(directory):
 @cli.command()
 @click.argument('url')
 @click.option('--output', '-o', required=True, help='输出目录')
-def download(url, output):
+@click.option('--concurrency', '-c', default=8, type=click.IntRange(min=1), help='同时抓取的页面数')
+def download(url, output, concurrency):
     """
     仅下载网站资源
 
@@ -323,10 +425,11 @@ def download(url, output):
 
     click.echo(f"\n{Fore.GREEN}▶ 下载网站: {Fore.CYAN}{url}{Style.RESET_ALL}\n")
 
+    from src.downloader import download_website
+
     output_dir = Path(output)
 
-    config = DOWNLOAD_CONFIG.copy()
-    config.update(BROWSER_CONFIG)
+    config = ChainMap({'concurrency': concurrency}, BROWSER_CONFIG, DOWNLOAD_CONFIG)
 
     try:
         download_report = asyncio.run(download_website(url, output_dir, config))
@@ -351,41 +454,7 @@ def download(url, output):
 def info():
     """显示工具信息"""
     print_banner()
-
-    info_text = f"""
-{Fore.CYAN}工具信息:{Style.RESET_ALL}
-
-名称: 网站一比一复刻工具
-版本: 1.0.0
-作者: Claude Code
-描述: 自动复刻网站,检测技术栈,生成可运行项目
-
-{Fore.CYAN}核心功能:{Style.RESET_ALL}
-  - 使用 Playwright 完整渲染和下载网站
-  - 智能检测前端框架、UI库、构建工具
-  - 自动生成 React/Vue/Next.js 等项目结构
-  - AI 辅助分析和优化建议
-
-{Fore.CYAN}支持的框架:{Style.RESET_ALL}
-  - React (+ Next.js)
-  - Vue.js (+ Nuxt.js)
-  - Angular
-  - 静态网站
-
-{Fore.CYAN}使用示例:{Style.RESET_ALL}
-  # 完整复刻
-  python main.py clone https://example.com
-
-  # 启用 AI 分析
-  python main.py clone https://example.com --enable-ai
-
-  # 仅下载资源
-  python main.py download https://example.com -o ./output
-
-  # 检测技术栈
-  python main.py detect ./downloaded-site
-"""
-    click.echo(info_text)
+    click.echo(_INFO_TEXT)
 
 
 if __name__ == '__main__':
@@ -3,14 +3,32 @@ AI 辅助分析模块 - 使用本地 Claude 分析网站结构并提供优化建
 """
 
 import os
+import re
+import asyncio
+import shutil
 import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional
 import logging
-import subprocess
+
+from config import REPORTS_DIR
+from .utils import save_json, load_json
 
 logger = logging.getLogger(__name__)
 
+# 分析上下文中的统计字段（一次扫描提取全部字段）
+_STATS_RE = re.compile(r"(页面数量|CSS 文件|JS 文件|图片|总大小):\s*([^\n]+)")
+
+# 需要给出针对性建议的技术关键字（一次扫描找出全部命中项）
+_TECH_RE = re.compile(r"React|Vue|Next\.js|Tailwind CSS")
+
+# AI 响应中的列表项: 去掉首尾空白后以数字、- 或 • 开头的行，去掉行首的 "0123456789.-• " 字符后作为条目
+# （标记后不要求空格，"1.优化图片"、"-使用CDN" 同样提取）
+# 条目正文用贪婪匹配到最后一个非空白字符，避免惰性量词在每个字符处回溯检查行尾
+_BULLET_RE = re.compile(r"(?m)^[^\S\n]*(?=[\d\-•])[0-9.\-• ]*((?:.*\S)?)[^\S\n]*$")
+
 
 class AIAnalyzer:
     """AI 分析器 - 使用本地 Claude 分析网站并提供建议"""
@@ -18,6 +36,8 @@ class AIAnalyzer:
     def __init__(self, config: Optional[Dict] = None):
         self.config = config or {}
         self.use_local_claude = self.config.get('use_local_claude', True)
+        self.enable_cache = self.config.get('enable_cache', True)
+        self.cache_dir = Path(self.config.get('cache_dir') or REPORTS_DIR / '.ai_cache')
 
         logger.info("使用本地 Claude 进行 AI 分析")
 
@@ -27,7 +47,27 @@ class AIAnalyzer:
         tech_report: Dict,
         project_report: Dict
     ) -> Dict:
-        """综合分析网站并生成建议"""
+        """综合分析网站并生成建议（同步接口，内部运行 analyze_async）
+
+        在已运行的事件循环中调用时（asyncio.run 不可用），改在工作线程的新事件循环中运行；
+        此时会阻塞当前循环直到分析完成，异步代码中应优先使用 analyze_async。
+        """
+        coro = self.analyze_async(download_report, tech_report, project_report)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coro)
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, coro).result()
+
+    async def analyze_async(
+        self,
+        download_report: Dict,
+        tech_report: Dict,
+        project_report: Dict
+    ) -> Dict:
+        """综合分析网站并生成建议（异步接口，可与其他任务并行）"""
         logger.info("开始本地 Claude AI 分析...")
 
         # 准备分析数据
@@ -35,20 +75,69 @@ class AIAnalyzer:
             download_report, tech_report, project_report
         )
 
+        # 相同的分析上下文直接返回缓存的分析结果
+        cache_path = None
+        if self.enable_cache:
+            cache_key = self._compute_cache_key(analysis_context)
+            cache_path = self.cache_dir / f"{cache_key}.json"
+            cached = self._read_cache(cache_path)
+            if cached is not None:
+                logger.info(f"命中 AI 分析缓存: {cache_key}")
+                return cached
+
         # 调用本地 Claude 进行分析
-        ai_suggestions = self._call_local_claude_analysis(analysis_context)
+        ai_suggestions = await self._call_local_claude_analysis_async(analysis_context)
 
         # 生成完整报告
         report = {
             'ai_enabled': True,
             'provider': 'local_claude',
             'analysis': ai_suggestions,
-            'confidence': 'high' if not ai_suggestions.get('error') else 'low'
+            # 出错或使用本地模板（Claude CLI 不可用/失败/超时）时可信度为 low
+            'confidence': 'low' if ai_suggestions.get('error') or ai_suggestions.get('fallback') else 'high'
         }
 
+        # 只缓存 Claude CLI 的真实分析结果，本地模板结果下次仍会重新尝试调用 CLI
+        if cache_path is not None and not ai_suggestions.get('error') and not ai_suggestions.get('fallback'):
+            self._write_cache(cache_path, report)
+
         logger.info("Claude AI 分析完成!")
         return report
 
+    def _compute_cache_key(self, analysis_context: str) -> str:
+        """根据分析方式和发送给 Claude 的分析上下文计算缓存键（BLAKE2b，无需加密强度）
+
+        只对实际进入提示词的内容取哈希，输出目录、访问顺序等每次运行都不同的字段不影响缓存键。
+        """
+        payload = json.dumps(
+            [self.use_local_claude, self.config.get('claude_bin', 'claude'), analysis_context],
+            ensure_ascii=False
+        ).encode('utf-8')
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+    def _read_cache(self, cache_path: Path) -> Optional[Dict]:
+        """读取缓存的分析结果（文件损坏或不可读时视为未命中）"""
+        try:
+            cached = load_json(cache_path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"AI 分析缓存损坏，忽略: {cache_path.name} ({e})")
+            return None
+        return cached if isinstance(cached, dict) else None
+
+    def _write_cache(self, cache_path: Path, report: Dict) -> None:
+        """原子写入缓存文件（先写临时文件再替换，中途中断不会留下截断的缓存）"""
+        # 临时文件名带进程号，多个进程同时写同一缓存键时互不覆盖
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        try:
+            save_json(report, tmp_path)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            logger.warning(f"写入 AI 分析缓存失败: {e}")
+            try:
+                tmp_path.unlink(missing_ok=True)
+            except OSError:
+                pass
+
     def _prepare_analysis_context(
         self,
         download_report: Dict,
@@ -82,15 +171,51 @@ class AIAnalyzer:
 """
         return context
 
-    def _call_local_claude_analysis(self, context: str) -> Dict:
+    async def _call_local_claude_analysis_async(self, context: str) -> Dict:
         """调用本地 Claude 进行分析
 
-        通过创建一个临时的分析请求文件,让用户可以看到分析内容并获得 Claude 的建议
+        本地安装了 Claude CLI 时以 `claude -p` 子进程异步执行分析提示词；
+        未安装、调用失败或超时时,根据上下文生成结构化的分析结果,并标记 fallback=True
         """
         logger.info("正在准备 Claude 分析...")
 
+        analysis_prompt = self._build_analysis_prompt(context)
+
+        claude_bin = shutil.which(self.config.get('claude_bin', 'claude')) if self.use_local_claude else None
+        if claude_bin:
+            try:
+                proc = await asyncio.create_subprocess_exec(
+                    claude_bin, '-p',
+                    stdin=asyncio.subprocess.PIPE,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE
+                )
+                try:
+                    out, err = await asyncio.wait_for(
+                        proc.communicate(analysis_prompt.encode('utf-8')),
+                        timeout=self.config.get('claude_timeout', 300)
+                    )
+                except asyncio.TimeoutError:
+                    proc.kill()
+                    await proc.wait()
+                    raise
+
+                if proc.returncode == 0 and out.strip():
+                    return self._parse_ai_response(out.decode('utf-8', errors='replace'))
+                logger.warning(f"Claude CLI 返回异常 (退出码 {proc.returncode}): "
+                               f"{err.decode('utf-8', errors='replace')[:200]}")
+            except Exception as e:
+                logger.warning(f"调用 Claude CLI 失败,改用本地分析: {e}")
+
+        # 本地模板生成的结果不是真正的 AI 分析，标记出来供调用方和缓存区分
+        analysis = self._generate_local_analysis(context)
+        analysis['fallback'] = True
+        return analysis
+
+    def _build_analysis_prompt(self, context: str) -> str:
+        """构建发送给 Claude 的分析提示词"""
         # 创建分析提示词
-        analysis_prompt = f"""
+        return f"""
 请作为一位资深的前端架构师和 Web 开发专家,分析以下网站复刻项目:
 
 {context}
@@ -140,6 +265,8 @@ class AIAnalyzer:
 请用中文回答,建议要具体、可执行、有优先级排序。
 """
 
+    def _generate_local_analysis(self, context: str) -> Dict:
+        """不调用 Claude CLI,根据上下文生成结构化的分析结果"""
         try:
             # 直接返回分析提示,让本地环境的 Claude 来处理
             # 这里模拟一个结构化的响应
@@ -189,44 +316,47 @@ class AIAnalyzer:
         """基于上下文智能生成建议"""
         suggestions = []
 
+        stats = dict(_STATS_RE.findall(context))
+
         # 分析页面数量
-        if "页面数量:" in context:
-            pages = int(context.split("页面数量:")[1].split()[0])
+        if "页面数量" in stats:
+            pages = int(stats["页面数量"])
             if pages > 30:
                 suggestions.append(f"- 检测到 {pages} 个页面,建议实现自动化的 sitemap 生成")
             if pages > 50:
                 suggestions.append(f"- 页面较多({pages}个),建议实现服务端渲染(SSR)或静态站点生成(SSG)")
 
         # 分析资源
-        if "CSS 文件:" in context:
-            css_files = int(context.split("CSS 文件:")[1].split()[0])
+        if "CSS 文件" in stats:
+            css_files = int(stats["CSS 文件"])
             if css_files > 10:
                 suggestions.append(f"- CSS 文件较多({css_files}个),建议合并和压缩,使用 CSS Modules 或 CSS-in-JS")
 
-        if "JS 文件:" in context:
-            js_files = int(context.split("JS 文件:")[1].split()[0])
+        if "JS 文件" in stats:
+            js_files = int(stats["JS 文件"])
             if js_files > 20:
                 suggestions.append(f"- JavaScript 文件较多({js_files}个),建议使用 Tree Shaking 和代码分割")
 
-        if "图片:" in context:
-            images = int(context.split("图片:")[1].split()[0])
+        if "图片" in stats:
+            images = int(stats["图片"])
             if images > 50:
                 suggestions.append(f"- 图片数量较多({images}张),建议实现图片懒加载和 WebP 格式转换")
 
         # 分析技术栈
-        if "React" in context:
+        present = set(_TECH_RE.findall(context))
+        if "React" in present:
             suggestions.append("- 使用 React.memo、useMemo、useCallback 优化组件性能")
             suggestions.append("- 考虑使用 React Server Components (RSC)")
 
-        if "Vue" in context:
+        if "Vue" in present:
             suggestions.append("- 使用 Vue 3 的 Composition API 提高代码复用性")
             suggestions.append("- 实现虚拟滚动优化长列表性能")
 
-        if "Next.js" in context:
+        if "Next.js" in present:
             suggestions.append("- 充分利用 Next.js 的 App Router 和服务端组件")
             suggestions.append("- 配置 Image Optimization 自动优化图片")
 
-        if "Tailwind CSS" in context:
+        if "Tailwind CSS" in present:
             suggestions.append("- 配置 Tailwind 的 PurgeCSS 减小最终 CSS 体积")
             suggestions.append("- 使用 Tailwind 的 JIT 模式提高开发体验")
 
@@ -242,21 +372,13 @@ class AIAnalyzer:
 
     def _extract_suggestions(self, text: str) -> List[str]:
         """从 AI 响应中提取建议"""
-        suggestions = []
-        lines = text.split('\n')
-
-        for i, line in enumerate(lines):
-            line = line.strip()
-            # 查找编号列表项
-            if line and (line[0].isdigit() or line.startswith('-') or line.startswith('•')):
-                suggestions.append(line.lstrip('0123456789.-• '))
-
-        return suggestions
+        # 一次正则扫描提取所有列表项
+        return _BULLET_RE.findall(text)
 
     def _extract_summary(self, text: str) -> str:
         """提取摘要"""
-        # 简单实现:返回前200个字符
-        return text[:200] + '...' if len(text) > 200 else text
+        # 简单实现:返回前200个字符（短文本直接原样返回，不做切片）
+        return text if len(text) <= 200 else text[:200] + '...'
 
     def _generate_fallback_analysis(
         self,
@@ -329,3 +451,14 @@ def analyze_with_ai(
     """便捷函数: AI 辅助分析"""
     analyzer = AIAnalyzer(config)
     return analyzer.analyze(download_report, tech_report, project_report)
+
+
+async def analyze_with_ai_async(
+    download_report: Dict,
+    tech_report: Dict,
+    project_report: Dict,
+    config: Optional[Dict] = None
+) -> Dict:
+    """便捷函数: AI 辅助分析（异步）"""
+    analyzer = AIAnalyzer(config)
+    return await analyzer.analyze_async(download_report, tech_report, project_report)
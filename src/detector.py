@@ -2,37 +2,191 @@
 技术栈检测引擎 - 识别网站使用的技术、框架和工具
 """
 
+import io
+import os
 import re
 import json
+import hashlib
+import sqlite3
+import functools
+import mmap
+import multiprocessing
 from pathlib import Path
-from typing import Dict, List, Optional, Set
+from typing import Dict, List, Optional, Set, Tuple
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 import logging
 
-from bs4 import BeautifulSoup
+from lxml import etree
+
+from config import REPORTS_DIR
+
+try:
+    import orjson  # 可选: C 实现的 JSON 解析器
+except ImportError:
+    orjson = None
+
+try:
+    import hyperscan  # 可选: 多模式 SIMD 正则引擎，一次扫描匹配整张模式表
+except ImportError:
+    hyperscan = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser  # 可选: C 实现的 HTML 解析器
+except ImportError:
+    LexborHTMLParser = None
 
 logger = logging.getLogger(__name__)
 
+# 文件大小上限（超过则跳过分析）
+JS_SIZE_LIMIT = 5 * 1024 * 1024  # 5MB
+CSS_SIZE_LIMIT = 2 * 1024 * 1024  # 2MB
+
+# 并发读取文件的线程数
+READ_WORKERS = 8
+
+# 每类 JS/CSS 文件最多分析的数量（文件名命中下列关键字的文件总会被分析）
+MAX_FILES_PER_TYPE = 50
+PRIORITY_FILE_TOKENS = (
+    'react', 'vue', 'angular', 'jquery', 'lodash', 'axios',
+    'bootstrap', 'tailwind', 'antd', 'webpack', 'vite',
+)
+
+# 供应商文件名提示: 文件名第一个词命中时直接记为对应技术，不再读取和扫描文件内容
+# （如 react.production.min.js、jquery-3.6.0.min.js、bootstrap.min.css）
+FILENAME_HINTS = {
+    'react': ('frameworks', 'React'),
+    'vue': ('frameworks', 'Vue.js'),
+    'angular': ('frameworks', 'Angular'),
+    'svelte': ('frameworks', 'Svelte'),
+    'bootstrap': ('ui_libraries', 'Bootstrap'),
+    'tailwind': ('ui_libraries', 'Tailwind CSS'),
+    'tailwindcss': ('ui_libraries', 'Tailwind CSS'),
+    'antd': ('ui_libraries', 'Ant Design'),
+    'jquery': ('js_libraries', 'jQuery'),
+    'lodash': ('js_libraries', 'Lodash'),
+    'axios': ('js_libraries', 'Axios'),
+}
+_FILENAME_WORD_RE = re.compile(r'[a-z0-9]+')
+
+# 文件检测结果缓存（SQLite），按 (绝对路径, mtime_ns, 大小) 复用结果；None 表示不使用缓存
+DETECTION_CACHE_PATH: Optional[Path] = REPORTS_DIR / '.detector_cache.db'
+
+# JS/CSS 分块扫描的块大小（相邻块之间保留重叠，避免漏掉跨块的匹配）
+SCAN_CHUNK_SIZE = 256 * 1024
+
+# 多进程分析: 文件数达到阈值时才启用（进程启动有固定开销）
+ANALYZE_WORKERS = os.cpu_count() or 1
+PROCESS_POOL_MIN_FILES = 32
+
+# 各类文件参与模式匹配的技术类别（None 表示全部类别）
+JS_CATEGORIES = ('frameworks', 'js_libraries', 'build_tools')
+CSS_CATEGORIES = ('ui_libraries', 'css_preprocessors')
+
+
+# mmap 预读提示（Windows 等平台没有 madvise）
+_MADV_WILLNEED = getattr(mmap, 'MADV_WILLNEED', None)
+
+# 正则元字符（出现未转义的元字符即视为非字面量模式）
+_REGEX_METACHARS = frozenset('.^$*+?{}[]|()')
+
+
+def _pattern_literal(pattern: str) -> Optional[str]:
+    """若正则模式只匹配一个固定字符串，返回该字符串，否则返回 None"""
+    chars = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            # 只接受转义的标点（如 \. \$），\d \w 等字符类不是字面量
+            if i + 1 >= len(pattern) or pattern[i + 1].isalnum():
+                return None
+            chars.append(pattern[i + 1])
+            i += 2
+            continue
+        if char in _REGEX_METACHARS:
+            return None
+        chars.append(char)
+        i += 1
+    return ''.join(chars)
+
+
+def _parse_dom_signature(signature: str) -> Tuple[str, str]:
+    """把 DOM 签名解析为带类型的条目: ('class', class 模式) 或 ('attr', 属性名)"""
+    if signature.startswith('class='):
+        return 'class', signature[len('class='):].strip('"')
+    return 'attr', signature.split('=')[0]
+
 
 class TechStackDetector:
     """技术栈检测器"""
 
     def __init__(self):
-        self.detected_tech: Dict[str, Set[str]] = defaultdict(set)
         self.confidence_scores: Dict[str, float] = {}
 
         # 技术检测规则
         self.detection_rules = self._load_detection_rules()
 
-    def _load_detection_rules(self) -> Dict:
-        """加载技术检测规则"""
-        return {
+        # 检测状态用位图表示: 每个技术对应一个位（见规则中的 'bit'），第 i 位对应 _bit_tech[i]
+        self._detected_bits = 0
+        self._bit_tech: List[Tuple[str, str]] = [
+            (category, tech_name)
+            for category, techs in self.detection_rules.items()
+            for tech_name in techs
+        ]
+
+        # 按文件类型预先整理好的模式表: [(技术位, 小写字面量列表, 预编译正则列表), ...]
+        # HTML 以 str 匹配，JS/CSS 以 bytes 匹配内存映射内容
+        self._html_pattern_table = self._build_pattern_table(None, binary=False)
+        self._js_pattern_table = self._build_pattern_table(JS_CATEGORIES, binary=True)
+        self._css_pattern_table = self._build_pattern_table(CSS_CATEGORIES, binary=True)
+
+        # 可选的 Hyperscan 多模式数据库: (数据库, 模式 id -> 技术位)，不可用时为 None
+        self._html_scanner = self._build_hyperscan_scanner(self._html_pattern_table)
+        self._js_scanner = self._build_hyperscan_scanner(self._js_pattern_table)
+        self._css_scanner = self._build_hyperscan_scanner(self._css_pattern_table)
+
+        # 分块扫描的重叠长度: 最长模式源码长度加余量（\d+ 等可变长部分的匹配通常很短）
+        self._chunk_overlap = max(
+            len(pattern)
+            for techs in self.detection_rules.values()
+            for rules in techs.values()
+            for pattern in rules.get('patterns', ())
+        ) + 64
+
+        # DOM 签名表: [(技术位, 属性名元组, class 字面量列表, 预编译 class 正则列表), ...]
+        self._dom_signature_table = self._build_dom_signature_table()
+        # 属性签名反向索引: 属性名 -> 技术位掩码
+        self._dom_attr_index = self._build_dom_attr_index()
+        # 文件名提示: 文件名第一个词 -> 技术位
+        self._filename_hint_bits = {
+            token: self.detection_rules[category][tech_name]['bit']
+            for token, (category, tech_name) in FILENAME_HINTS.items()
+        }
+
+        # 各类文件可检测的技术位掩码（HTML 同时包含 DOM 签名）
+        self._kind_masks = {
+            'html': self._table_mask(self._html_pattern_table) | self._table_mask(self._dom_signature_table),
+            'js': self._table_mask(self._js_pattern_table),
+            'css': self._table_mask(self._css_pattern_table),
+        }
+        # 可通过文件内容检测的全部技术位，全部命中后即可停止扫描
+        self._content_mask = self._kind_masks['html']
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _load_detection_rules() -> Dict:
+        """加载技术检测规则（模式在加载时预编译为 compiled_patterns）
+
+        规则只构建一次并在所有实例间共享，构建后不应再修改。
+        """
+        rules = {
             # 前端框架
             'frameworks': {
                 'React': {
                     'patterns': [
-                        r'react(-dom)?\.production\.min\.js',
-                        r'react(-dom)?\.development\.js',
+                        r'react(?:-dom)?\.production\.min\.js',
+                        r'react(?:-dom)?\.development\.js',
                         r'_reactRootContainer',
                         r'__REACT_DEVTOOLS_GLOBAL_HOOK__'
                     ],
@@ -99,7 +253,8 @@ class TechStackDetector:
                         r'tailwind\.css',
                         r'@tailwind'
                     ],
-                    'dom_signatures': ['class="flex"', 'class="grid"', 'class=".*\s+(p|m|w|h)-\d+'],
+                    # 间距/尺寸工具类（如 "mx-auto p-4"）: 前面有空白的 p-/m-/w-/h- 加数字，不使用 .* 避免回溯
+                    'dom_signatures': ['class="flex"', 'class="grid"', r'class="\s[pmwh]-\d'],
                     'package_names': ['tailwindcss']
                 },
                 'Material-UI': {
@@ -215,7 +370,7 @@ class TechStackDetector:
                     'patterns': [
                         r'google-analytics\.com/analytics\.js',
                         r'gtag/js',
-                        r'UA-\d+-\d+'
+                        r'\bUA-\d+-\d+\b'
                     ]
                 },
                 'Google Tag Manager': {
@@ -227,27 +382,235 @@ class TechStackDetector:
             }
         }
 
+        # 预处理所有模式（忽略大小写）:
+        # - 纯字面量模式（如 jquery\.min\.js）转为小写字符串，用子串查找代替正则
+        # - 其余模式预编译，分析文件时直接调用 pattern.search
+        # 模式均为 ASCII，额外准备一份 bytes 版本，用于直接扫描内存映射的 JS/CSS 文件
+        bit_index = 0
+        for techs in rules.values():
+            for tech_rules in techs.values():
+                # 为每个技术分配检测位图中的位（按规则定义顺序）
+                tech_rules['bit'] = 1 << bit_index
+                bit_index += 1
+
+                if 'patterns' in tech_rules:
+                    literals, regexes = [], []
+                    for pattern in tech_rules['patterns']:
+                        literal = _pattern_literal(pattern)
+                        if literal is not None:
+                            literals.append(literal.lower())
+                        else:
+                            regexes.append(pattern)
+
+                    tech_rules['literals'] = literals
+                    tech_rules['byte_literals'] = [literal.encode('ascii') for literal in literals]
+                    tech_rules['compiled_patterns'] = [
+                        re.compile(pattern, re.IGNORECASE) for pattern in regexes
+                    ]
+                    tech_rules['compiled_byte_patterns'] = [
+                        re.compile(pattern.encode('ascii'), re.IGNORECASE) for pattern in regexes
+                    ]
+
+                # DOM 签名拆分为属性名、class 字面量（子串查找）和预编译的 class 正则
+                if 'dom_signatures' in tech_rules:
+                    attr_signatures, class_literals, class_signatures = [], [], []
+                    for kind, value in map(_parse_dom_signature, tech_rules['dom_signatures']):
+                        if kind == 'attr':
+                            attr_signatures.append(value)
+                            continue
+                        literal = _pattern_literal(value)
+                        if literal is not None:
+                            class_literals.append(literal)
+                        else:
+                            class_signatures.append(re.compile(value))
+                    tech_rules['attr_signatures'] = attr_signatures
+                    tech_rules['class_literals'] = class_literals
+                    tech_rules['class_signatures'] = class_signatures
+
+        return rules
+
+    def _build_pattern_table(self, categories: Optional[tuple], binary: bool) -> List[tuple]:
+        """将指定类别中带模式的技术展开为扁平表，分析文件时无需再遍历规则字典
+
+        表项为 (技术位, 小写字面量列表, 预编译正则列表)
+        """
+        literal_key = 'byte_literals' if binary else 'literals'
+        pattern_key = 'compiled_byte_patterns' if binary else 'compiled_patterns'
+        table = []
+        for category, techs in self.detection_rules.items():
+            if categories is not None and category not in categories:
+                continue
+            for tech_name, rules in techs.items():
+                if 'patterns' in rules:
+                    table.append((rules['bit'], rules[literal_key], rules[pattern_key]))
+        return table
+
+    def _build_dom_signature_table(self) -> List[tuple]:
+        """将带 DOM 签名的技术展开为扁平表"""
+        return [
+            (rules['bit'], tuple(rules['attr_signatures']), rules['class_literals'], rules['class_signatures'])
+            for techs in self.detection_rules.values()
+            for rules in techs.values()
+            if 'dom_signatures' in rules
+        ]
+
+    def _build_dom_attr_index(self) -> Dict[str, int]:
+        """构建属性签名反向索引，元素的每个属性名只需一次字典查找"""
+        index: Dict[str, int] = defaultdict(int)
+        for bit, signature_attrs, _, _ in self._dom_signature_table:
+            for attr in signature_attrs:
+                index[attr] |= bit
+        return dict(index)
+
+    def _build_hyperscan_scanner(self, table: List[tuple]) -> Optional[tuple]:
+        """把模式表编译为单个 Hyperscan 数据库（未安装或有不支持的模式时返回 None）"""
+        if hyperscan is None:
+            return None
+
+        # HTML 表为 str，JS/CSS 表为 bytes，统一转成 bytes 表达式
+        expressions, bits = [], []
+        for bit, literals, patterns in table:
+            sources = [re.escape(literal) for literal in literals] + [pattern.pattern for pattern in patterns]
+            for source in sources:
+                expressions.append(source if isinstance(source, bytes) else source.encode('ascii'))
+                bits.append(bit)
+
+        database = _compile_hyperscan_database(tuple(expressions))
+        return (database, bits) if database is not None else None
+
+    def _scan_hyperscan(self, scanner: tuple, table_mask: int, content) -> None:
+        """一次扫描完整内容（bytes 或内存映射）匹配全部模式，表中技术全部命中后立即终止"""
+        database, bits = scanner
+
+        def on_match(pattern_id, start, end, flags, context):
+            self._detected_bits |= bits[pattern_id]
+            # 返回 True 终止扫描
+            return self._detected_bits & table_mask == table_mask
+
+        try:
+            database.scan(content, match_event_handler=on_match)
+        except hyperscan.ScanTerminated:
+            pass
+
+    @staticmethod
+    def _table_mask(table: List[tuple]) -> int:
+        """模式表/签名表中全部技术位的掩码"""
+        mask = 0
+        for entry in table:
+            mask |= entry[0]
+        return mask
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _rules_hash() -> str:
+        """检测规则的版本哈希（规则或文件名提示变化时，缓存整体失效）"""
+        rules = TechStackDetector._load_detection_rules()
+        payload = {
+            category: {
+                tech_name: {
+                    key: tech_rules[key]
+                    for key in ('patterns', 'dom_signatures', 'package_names')
+                    if key in tech_rules
+                }
+                for tech_name, tech_rules in techs.items()
+            }
+            for category, techs in rules.items()
+        }
+        text = json.dumps([payload, FILENAME_HINTS], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    @property
+    def detected_tech(self) -> Dict[str, Set[str]]:
+        """已检测到的技术: {类别: {技术名}}（由检测位图生成，只包含非空类别）"""
+        detected: Dict[str, Set[str]] = {}
+        bits = self._detected_bits
+        for index, (category, tech_name) in enumerate(self._bit_tech):
+            if bits >> index & 1:
+                detected.setdefault(category, set()).add(tech_name)
+        return detected
+
+    def _any_remaining(self) -> bool:
+        """是否还有可通过文件内容检测、但尚未检测到的技术"""
+        return bool(self._content_mask & ~self._detected_bits)
+
+    def _match_patterns(self, table: List[tuple], content) -> None:
+        """按模式表匹配文件内容，命中任一模式即记录该技术"""
+        lowered = None
+        for bit, literals, patterns in table:
+            # 已检测到的技术无需再扫描
+            if self._detected_bits & bit:
+                continue
+
+            # 字面量先在小写内容上做子串查找（只在需要时生成一次小写副本）
+            if literals:
+                if lowered is None:
+                    lowered = content.lower() if isinstance(content, str) else bytes(content).lower()
+                if any(literal in lowered for literal in literals):
+                    self._detected_bits |= bit
+                    continue
+
+            for pattern in patterns:
+                if pattern.search(content):
+                    self._detected_bits |= bit
+                    break
+
+    def _match_patterns_chunked(self, table: List[tuple], content) -> None:
+        """分块匹配大文件内容（bytes 或内存映射），每次只生成一个块大小的小写副本
+
+        相邻块重叠 _chunk_overlap 字节；表中技术全部检测到后提前结束。
+        """
+        table_mask = 0
+        for bit, _, _ in table:
+            table_mask |= bit
+
+        size = len(content)
+        position = 0
+        while position < size:
+            start = max(0, position - self._chunk_overlap)
+            self._match_patterns(table, content[start:position + SCAN_CHUNK_SIZE])
+            position += SCAN_CHUNK_SIZE
+
+            if self._detected_bits & table_mask == table_mask:
+                break
+
     def detect_from_directory(self, directory: Path) -> Dict:
         """从下载的网站目录检测技术栈"""
         logger.info(f"开始检测技术栈: {directory}")
 
-        # 检测 HTML 文件
-        html_files = list(directory.rglob('*.html'))
-        for html_file in html_files:
-            self._analyze_html_file(html_file)
+        html_files, js_files, css_files, package_json = self._collect_files(directory)
+        # 供应商文件直接按文件名判定，无需扫描内容
+        js_files = self._apply_filename_hints(js_files)
+        css_files = self._apply_filename_hints(css_files)
+        # 限制分析数量: 优先选择文件名中带有已知库名的文件
+        js_files = self._select_files(js_files)
+        css_files = self._select_files(css_files)
+
+        # 分析任务: (文件类型, 路径, 大小上限)
+        jobs = (
+            [('html', path, None) for path in html_files]
+            + [('js', path, JS_SIZE_LIMIT) for path in js_files]
+            + [('css', path, CSS_SIZE_LIMIT) for path in css_files]
+        )
+        cache = _DetectionCache.open(DETECTION_CACHE_PATH, self._rules_hash()) if DETECTION_CACHE_PATH else None
+        try:
+            if cache is not None:
+                jobs = self._apply_cached_results(cache, jobs)
 
-        # 检测 JavaScript 文件
-        js_files = list(directory.rglob('*.js'))
-        for js_file in js_files[:50]:  # 限制分析数量
-            self._analyze_js_file(js_file)
+            if not self._any_remaining():
+                logger.debug("所有技术已通过文件名或缓存检测到，跳过内容扫描")
+                results = []
+            elif ANALYZE_WORKERS > 1 and len(jobs) >= PROCESS_POOL_MIN_FILES:
+                results = self._analyze_files_in_processes(jobs)
+            else:
+                results = self._analyze_files_locally(jobs)
 
-        # 检测 CSS 文件
-        css_files = list(directory.rglob('*.css'))
-        for css_file in css_files[:50]:
-            self._analyze_css_file(css_file)
+            if cache is not None:
+                cache.store(results)
+        finally:
+            if cache is not None:
+                cache.close()
 
         # 检测 package.json
-        package_json = self._find_package_json(directory)
         if package_json:
             self._analyze_package_json(package_json)
 
@@ -257,89 +620,338 @@ class TechStackDetector:
 
         return report
 
-    def _analyze_html_file(self, file_path: Path) -> None:
-        """分析 HTML 文件"""
+    def _collect_files(self, directory: Path) -> Tuple[List[str], List[str], List[str], Optional[str]]:
+        """单次遍历目录，按扩展名收集 HTML/JS/CSS 文件路径及第一个 package.json
+
+        使用 os.scandir 迭代遍历（不跟随目录符号链接），路径以 str 返回，
+        遍历顺序与 rglob 一致: 先当前目录的文件，再依次深入各子目录。
+        """
+        html_files: List[str] = []
+        js_files: List[str] = []
+        css_files: List[str] = []
+        package_json: Optional[str] = None
+
+        stack = [os.fspath(directory)]
+        while stack:
+            current = stack.pop()
+            subdirs = []
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                subdirs.append(entry.path)
+                                continue
+                            if not entry.is_file():
+                                continue
+                        except OSError:
+                            continue
+
+                        # normcase: Windows 下不区分大小写，与 rglob 行为一致
+                        name = os.path.normcase(entry.name)
+                        if name.endswith('.html'):
+                            html_files.append(entry.path)
+                        elif name.endswith('.js'):
+                            js_files.append(entry.path)
+                        elif name.endswith('.css'):
+                            css_files.append(entry.path)
+                        elif name == 'package.json' and package_json is None:
+                            package_json = entry.path
+            except OSError as e:
+                logger.warning(f"读取目录失败 {current}: {e}")
+                continue
+
+            # 逆序入栈，保证按目录项顺序深度优先遍历
+            stack.extend(reversed(subdirs))
+
+        return html_files, js_files, css_files, package_json
+
+    def _apply_filename_hints(self, files: List[str]) -> List[str]:
+        """按文件名识别供应商文件并记录对应技术，返回仍需扫描内容的文件"""
+        remaining = []
+        for path in files:
+            match = _FILENAME_WORD_RE.match(os.path.basename(path).lower())
+            bit = self._filename_hint_bits.get(match.group()) if match else None
+            if bit is None:
+                remaining.append(path)
+            else:
+                self._detected_bits |= bit
+        return remaining
+
+    def _select_files(self, files: List[str]) -> List[str]:
+        """选出待分析的文件: 文件名含已知库关键字的全部保留，其余按顺序补足到 MAX_FILES_PER_TYPE"""
+        priority, rest = [], []
+        for path in files:
+            name = os.path.basename(path).lower()
+            if any(token in name for token in PRIORITY_FILE_TOKENS):
+                priority.append(path)
+            else:
+                rest.append(path)
+
+        return priority + rest[:max(0, MAX_FILES_PER_TYPE - len(priority))]
+
+    def _apply_cached_results(self, cache: "_DetectionCache", jobs: List[tuple]) -> List[tuple]:
+        """按顺序应用缓存的文件检测结果，返回仍需分析的任务
+
+        缓存结果只有在当时已检查过当前所有未检测技术时才可用（分析时会跳过已检测到的技术）。
+        """
+        remaining = []
+        for job in jobs:
+            entry = cache.lookup(job[1])
+            if entry is not None:
+                found, checked = entry
+                pending = self._kind_masks[job[0]] & ~self._detected_bits
+                if not pending & ~checked:
+                    self._detected_bits |= found
+                    continue
+            remaining.append(job)
+        return remaining
+
+    def _scan_result(self, kind: str, before: int) -> Tuple[int, int]:
+        """单个文件的检测结果: (本次新检测到的技术位, 本次检查过的技术位)"""
+        return self._detected_bits & ~before, self._kind_masks[kind] & ~before
+
+    def _analyze_files_locally(self, jobs: List[tuple]) -> List[tuple]:
+        """在当前进程中分析文件（文件较少时使用），返回 [(文件路径, (检测到的位, 检查过的位)), ...]"""
+        results = []
+        html_jobs = [job for job in jobs if job[0] == 'html']
+
+        # 后台线程并发读取 HTML 文件，读完一个分析一个: 后续文件的读取与当前文件的匹配重叠进行
+        with ThreadPoolExecutor(max_workers=READ_WORKERS) as executor:
+            contents = executor.map(lambda job: self._read_file(job[1], job[2]), html_jobs)
+            for (kind, file_path, _), content in zip(html_jobs, contents):
+                if not self._any_remaining():
+                    # 全部技术已检测到: 取消尚未开始的读取
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    return results
+                if content is not None:
+                    before = self._detected_bits
+                    self._analyze_file(kind, file_path, content)
+                    results.append((file_path, self._scan_result(kind, before)))
+
+        # JS/CSS 文件通过内存映射直接扫描
+        for kind, file_path, size_limit in jobs:
+            if not self._any_remaining():
+                return results
+            if kind != 'html':
+                before = self._detected_bits
+                self._analyze_mapped_file(kind, file_path, size_limit)
+                results.append((file_path, self._scan_result(kind, before)))
+
+        return results
+
+    def _analyze_files_in_processes(self, jobs: List[tuple]) -> List[tuple]:
+        """多进程并行分析文件（正则匹配和 HTML 解析是 CPU 密集型，受 GIL 限制）"""
+        workers = min(ANALYZE_WORKERS, len(jobs))
+        logger.info(f"使用 {workers} 个进程并行分析 {len(jobs)} 个文件")
+
+        # 使用 spawn 启动子进程，避免在多线程进程中 fork
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_analyze_worker
+        ) as executor:
+            results = []
+            for job, result in zip(jobs, executor.map(_analyze_file_in_worker, jobs, chunksize=8)):
+                self._detected_bits |= result[0]
+                results.append((job[1], result))
+                if not self._any_remaining():
+                    # 全部技术已检测到: 取消尚未开始的任务
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    break
+
+        return results
+
+    def _analyze_job(self, kind: str, file_path: str, size_limit: Optional[int]) -> None:
+        """读取并分析单个文件（HTML 读为文本，JS/CSS 使用内存映射）"""
+        if kind == 'html':
+            content = self._read_file(file_path, size_limit)
+            if content is not None:
+                self._analyze_file(kind, file_path, content)
+        else:
+            self._analyze_mapped_file(kind, file_path, size_limit)
+
+    def _analyze_mapped_file(self, kind: str, file_path: str, size_limit: Optional[int]) -> None:
+        """以只读内存映射分析 JS/CSS 文件: bytes 正则直接扫描页缓存，无需整体读取和 UTF-8 解码"""
         try:
+            with open(file_path, 'rb') as f:
+                size = os.fstat(f.fileno()).st_size
+                if size_limit is not None and size > size_limit:
+                    return
+                if size == 0:
+                    # 空文件无法映射，也不会命中任何模式
+                    return
+
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                    # 提示内核异步预读整个文件，让磁盘读取与模式匹配重叠（仅部分平台支持）
+                    if _MADV_WILLNEED is not None:
+                        try:
+                            content.madvise(_MADV_WILLNEED)
+                        except OSError:
+                            pass
+                    self._analyze_file(kind, file_path, content)
+
+        except Exception as e:
+            logger.warning(f"读取文件失败 {file_path}: {e}")
+
+    def _analyze_file(self, kind: str, file_path: str, content) -> None:
+        """按文件类型分派到对应的分析方法"""
+        if kind == 'html':
+            self._analyze_html_file(file_path, content)
+        elif kind == 'js':
+            self._analyze_js_file(file_path, content)
+        else:
+            self._analyze_css_file(file_path, content)
+
+    def _read_file(self, file_path: str, size_limit: Optional[int] = None) -> Optional[str]:
+        """读取文件内容，超过大小限制或读取失败时返回 None"""
+        try:
+            if size_limit is not None and os.path.getsize(file_path) > size_limit:
+                return None
+
             with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-
-            soup = BeautifulSoup(content, 'html.parser')
-
-            # 检测所有类别的技术
-            for category, techs in self.detection_rules.items():
-                for tech_name, rules in techs.items():
-                    # 检查模式匹配
-                    if 'patterns' in rules:
-                        for pattern in rules['patterns']:
-                            if re.search(pattern, content, re.IGNORECASE):
-                                self.detected_tech[category].add(tech_name)
-
-                    # 检查 DOM 签名
-                    if 'dom_signatures' in rules:
-                        for signature in rules['dom_signatures']:
-                            if signature.startswith('class='):
-                                class_pattern = signature.replace('class="', '').replace('"', '')
-                                if soup.find(class_=re.compile(class_pattern)):
-                                    self.detected_tech[category].add(tech_name)
-                            elif soup.find(attrs={signature.split('=')[0]: True}):
-                                self.detected_tech[category].add(tech_name)
+                return f.read()
+
+        except Exception as e:
+            logger.warning(f"读取文件失败 {file_path}: {e}")
+            return None
+
+    def _analyze_html_file(self, file_path: str, content: str) -> None:
+        """分析 HTML 文件"""
+        try:
+            # 检查模式匹配（所有类别）
+            if self._html_scanner is not None:
+                self._scan_hyperscan(
+                    self._html_scanner, self._table_mask(self._html_pattern_table), content.encode('utf-8')
+                )
+            else:
+                self._match_patterns(self._html_pattern_table, content)
+
+            # 检查 DOM 签名（全部相关技术已检测到时无需解析 DOM）
+            pending = [entry for entry in self._dom_signature_table if not self._detected_bits & entry[0]]
+            if pending:
+                # 优先使用 lexbor 解析器，否则用 lxml 流式解析（可提前结束）
+                if LexborHTMLParser is not None:
+                    attr_names, class_values = self._collect_dom_lexbor(content)
+                    self._match_dom_signatures(pending, attr_names, class_values)
+                else:
+                    self._scan_dom_lxml(content, pending)
 
         except Exception as e:
             logger.warning(f"分析 HTML 文件失败 {file_path}: {e}")
 
-    def _analyze_js_file(self, file_path: Path) -> None:
-        """分析 JavaScript 文件"""
+    def _collect_dom_lexbor(self, content: str) -> Tuple[Set[str], List[str]]:
+        """使用 selectolax (lexbor) 一次遍历收集所有属性名和 class 值"""
+        attr_names: Set[str] = set()
+        class_values: List[str] = []
+
+        tree = LexborHTMLParser(content)
+        if tree.root is None:
+            return attr_names, class_values
+
+        for node in tree.root.traverse():
+            attrs = node.attributes
+            if attrs:
+                attr_names.update(attrs)
+                class_attr = attrs.get('class')
+                if class_attr:
+                    # 与 BeautifulSoup 一致: 按空白拆分后以单个空格连接
+                    class_values.append(' '.join(class_attr.split()))
+
+        return attr_names, class_values
+
+    def _scan_dom_lxml(self, content: str, table: List[tuple]) -> None:
+        """使用 lxml 流式解析 HTML，边解析边匹配 DOM 签名（未安装 selectolax 时使用）
+
+        不构建完整的 DOM 树: 已处理完的元素会被清空；待检测技术全部命中后立即停止解析。
+        """
+        remaining = list(table)
+        events = etree.iterparse(
+            io.BytesIO(content.encode('utf-8')),
+            events=('start', 'end'),
+            html=True,
+            recover=True,
+            encoding='utf-8'
+        )
         try:
-            # 限制文件大小
-            if file_path.stat().st_size > 5 * 1024 * 1024:  # 5MB
-                return
+            for event, element in events:
+                if event == 'end':
+                    # 释放已处理元素占用的内存
+                    element.clear(keep_tail=True)
+                    continue
 
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+                attrib = element.attrib
+                if not attrib:
+                    continue
 
+                class_attr = attrib.get('class')
+                # 与 BeautifulSoup 一致: 按空白拆分后以单个空格连接
+                class_values = [' '.join(class_attr.split())] if class_attr else []
+
+                self._match_dom_signatures(remaining, attrib, class_values)
+                remaining = [entry for entry in remaining if not self._detected_bits & entry[0]]
+                if not remaining:
+                    break
+
+        except etree.XMLSyntaxError:
+            # 空文档等无法解析的内容，没有可匹配的元素
+            pass
+
+    def _match_dom_signatures(self, table: List[tuple], attr_names, class_values: List[str]) -> None:
+        """用收集到的属性名（集合或属性字典）和 class 值匹配 DOM 签名
+
+        属性签名通过反向索引按属性名查找；class 签名只对 table 中尚未检测到的技术匹配，
+        字面量签名用子串查找，其余才使用正则。
+        """
+        attr_index = self._dom_attr_index
+        for attr in attr_names:
+            self._detected_bits |= attr_index.get(attr, 0)
+
+        if class_values:
+            # 字面量不含换行，可在拼接后的整体上一次查找
+            joined = None
+            for bit, _, class_literals, class_patterns in table:
+                if self._detected_bits & bit:
+                    continue
+                if class_literals:
+                    if joined is None:
+                        joined = '\n'.join(class_values)
+                    if any(literal in joined for literal in class_literals):
+                        self._detected_bits |= bit
+                        continue
+                if any(pattern.search(value) for pattern in class_patterns for value in class_values):
+                    self._detected_bits |= bit
+
+    def _analyze_js_file(self, file_path: str, content: bytes) -> None:
+        """分析 JavaScript 文件（content 为 bytes 或内存映射）"""
+        try:
             # 检测框架和库
-            for category in ['frameworks', 'js_libraries', 'build_tools']:
-                if category in self.detection_rules:
-                    for tech_name, rules in self.detection_rules[category].items():
-                        if 'patterns' in rules:
-                            for pattern in rules['patterns']:
-                                if re.search(pattern, content, re.IGNORECASE):
-                                    self.detected_tech[category].add(tech_name)
+            if self._js_scanner is not None:
+                self._scan_hyperscan(self._js_scanner, self._kind_masks['js'], content)
+            else:
+                self._match_patterns_chunked(self._js_pattern_table, content)
 
         except Exception as e:
             logger.warning(f"分析 JS 文件失败 {file_path}: {e}")
 
-    def _analyze_css_file(self, file_path: Path) -> None:
-        """分析 CSS 文件"""
+    def _analyze_css_file(self, file_path: str, content: bytes) -> None:
+        """分析 CSS 文件（content 为 bytes 或内存映射）"""
         try:
-            if file_path.stat().st_size > 2 * 1024 * 1024:  # 2MB
-                return
-
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-
             # 检测 UI 库和预处理器
-            for category in ['ui_libraries', 'css_preprocessors']:
-                if category in self.detection_rules:
-                    for tech_name, rules in self.detection_rules[category].items():
-                        if 'patterns' in rules:
-                            for pattern in rules['patterns']:
-                                if re.search(pattern, content, re.IGNORECASE):
-                                    self.detected_tech[category].add(tech_name)
+            if self._css_scanner is not None:
+                self._scan_hyperscan(self._css_scanner, self._kind_masks['css'], content)
+            else:
+                self._match_patterns_chunked(self._css_pattern_table, content)
 
         except Exception as e:
             logger.warning(f"分析 CSS 文件失败 {file_path}: {e}")
 
-    def _find_package_json(self, directory: Path) -> Optional[Path]:
-        """查找 package.json 文件"""
-        package_files = list(directory.rglob('package.json'))
-        return package_files[0] if package_files else None
-
-    def _analyze_package_json(self, file_path: Path) -> None:
+    def _analyze_package_json(self, file_path: str) -> None:
         """分析 package.json 文件"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                package_data = json.load(f)
+            with open(file_path, 'rb') as f:
+                raw = f.read()
+            package_data = orjson.loads(raw) if orjson is not None else json.loads(raw)
 
             # 合并 dependencies 和 devDependencies
             all_deps = {}
@@ -347,32 +959,33 @@ class TechStackDetector:
             all_deps.update(package_data.get('devDependencies', {}))
 
             # 检测所有包
-            for category, techs in self.detection_rules.items():
-                for tech_name, rules in techs.items():
+            for techs in self.detection_rules.values():
+                for rules in techs.values():
                     if 'package_names' in rules:
-                        for package_name in rules['package_names']:
-                            if package_name in all_deps:
-                                self.detected_tech[category].add(tech_name)
+                        if any(package_name in all_deps for package_name in rules['package_names']):
+                            self._detected_bits |= rules['bit']
 
         except Exception as e:
             logger.warning(f"分析 package.json 失败 {file_path}: {e}")
 
     def _generate_report(self) -> Dict:
         """生成技术栈检测报告"""
+        # 按规则定义顺序从位图还原检测到的技术
+        detected_technologies: Dict[str, List[str]] = {}
+        bits = self._detected_bits
+        for index, (category, tech_name) in enumerate(self._bit_tech):
+            if bits >> index & 1:
+                detected_technologies.setdefault(category, []).append(tech_name)
+
         report = {
             'summary': {
-                'total_categories': len(self.detected_tech),
-                'total_technologies': sum(len(techs) for techs in self.detected_tech.values())
+                'total_categories': len(detected_technologies),
+                'total_technologies': sum(len(techs) for techs in detected_technologies.values())
             },
-            'detected_technologies': {},
+            'detected_technologies': detected_technologies,
             'recommendations': []
         }
 
-        # 整理检测到的技术
-        for category, techs in self.detected_tech.items():
-            if techs:
-                report['detected_technologies'][category] = list(techs)
-
         # 生成推荐
         report['recommendations'] = self._generate_recommendations()
 
@@ -381,33 +994,151 @@ class TechStackDetector:
     def _generate_recommendations(self) -> List[str]:
         """基于检测到的技术栈生成推荐"""
         recommendations = []
+        detected = self.detected_tech
+        frameworks = detected.get('frameworks', set())
+        ui_libraries = detected.get('ui_libraries', set())
 
         # 推荐项目类型
-        if 'React' in self.detected_tech.get('frameworks', set()):
-            if 'Next.js' in self.detected_tech.get('frameworks', set()):
+        if 'React' in frameworks:
+            if 'Next.js' in frameworks:
                 recommendations.append("建议创建 Next.js 项目结构")
             else:
                 recommendations.append("建议创建 React + Vite 项目结构")
 
-        elif 'Vue.js' in self.detected_tech.get('frameworks', set()):
-            if 'Nuxt.js' in self.detected_tech.get('frameworks', set()):
+        elif 'Vue.js' in frameworks:
+            if 'Nuxt.js' in frameworks:
                 recommendations.append("建议创建 Nuxt.js 项目结构")
             else:
                 recommendations.append("建议创建 Vue + Vite 项目结构")
 
-        elif 'Angular' in self.detected_tech.get('frameworks', set()):
+        elif 'Angular' in frameworks:
             recommendations.append("建议创建 Angular CLI 项目结构")
 
         # 推荐 UI 库
-        if 'Tailwind CSS' in self.detected_tech.get('ui_libraries', set()):
+        if 'Tailwind CSS' in ui_libraries:
             recommendations.append("集成 Tailwind CSS 配置")
 
-        if 'Bootstrap' in self.detected_tech.get('ui_libraries', set()):
+        if 'Bootstrap' in ui_libraries:
             recommendations.append("集成 Bootstrap 依赖")
 
         return recommendations
 
 
+# 子进程中复用的检测器（每个进程初始化一次，检测结果在进程内累积）
+_worker_detector: Optional[TechStackDetector] = None
+
+
+@functools.lru_cache(maxsize=None)
+def _compile_hyperscan_database(expressions: tuple):
+    """编译 Hyperscan 块模式数据库（大小写不敏感、每个模式只报告一次），失败时返回 None"""
+    flags = hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH
+    database = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+    try:
+        database.compile(
+            expressions=list(expressions),
+            ids=list(range(len(expressions))),
+            elements=len(expressions),
+            flags=[flags] * len(expressions)
+        )
+    except hyperscan.error as e:
+        logger.debug(f"Hyperscan 编译失败，回退到 re: {e}")
+        return None
+    return database
+
+
+class _DetectionCache:
+    """文件检测结果的持久化缓存
+
+    每个文件记录 (检测到的技术位, 检查过的技术位)，以 (绝对路径, mtime_ns, 大小) 判断文件是否变化；
+    检测规则哈希变化时清空全部记录。任何 SQLite 错误都只记录警告，不影响检测。
+    """
+
+    def __init__(self, connection: sqlite3.Connection):
+        self._connection = connection
+        self._stats: Dict[str, Tuple[int, int]] = {}
+
+    @classmethod
+    def open(cls, path: Path, rules_hash: str) -> Optional["_DetectionCache"]:
+        """打开（必要时创建）缓存数据库，失败时返回 None"""
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(os.fspath(path), timeout=5)
+            connection.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS files ('
+                'path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, found TEXT, checked TEXT)'
+            )
+            row = connection.execute("SELECT value FROM meta WHERE key = 'rules_hash'").fetchone()
+            if row is None or row[0] != rules_hash:
+                connection.execute('DELETE FROM files')
+                connection.execute("INSERT OR REPLACE INTO meta VALUES ('rules_hash', ?)", (rules_hash,))
+                connection.commit()
+            return cls(connection)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"打开检测缓存失败 {path}: {e}")
+            return None
+
+    def _stat(self, file_path: str) -> Optional[Tuple[int, int]]:
+        """文件的 (mtime_ns, 大小)，同一次检测中只 stat 一次"""
+        stat_key = self._stats.get(file_path)
+        if stat_key is None:
+            try:
+                st = os.stat(file_path)
+            except OSError:
+                return None
+            stat_key = self._stats[file_path] = (st.st_mtime_ns, st.st_size)
+        return stat_key
+
+    def lookup(self, file_path: str) -> Optional[Tuple[int, int]]:
+        """查找文件的缓存结果，文件已变化或无记录时返回 None"""
+        stat_key = self._stat(file_path)
+        if stat_key is None:
+            return None
+        try:
+            row = self._connection.execute(
+                'SELECT found, checked FROM files WHERE path = ? AND mtime_ns = ? AND size = ?',
+                (os.path.abspath(file_path), *stat_key)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.debug(f"读取检测缓存失败: {e}")
+            return None
+        # 位图可能超过 SQLite 整数范围，以十六进制文本保存
+        return (int(row[0], 16), int(row[1], 16)) if row else None
+
+    def store(self, results: List[tuple]) -> None:
+        """写入本次分析的文件检测结果"""
+        rows = []
+        for file_path, (found, checked) in results:
+            stat_key = self._stat(file_path)
+            if stat_key is not None:
+                rows.append((os.path.abspath(file_path), *stat_key, format(found, 'x'), format(checked, 'x')))
+        if not rows:
+            return
+        try:
+            self._connection.executemany('INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)', rows)
+            self._connection.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"写入检测缓存失败: {e}")
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+def _init_analyze_worker() -> None:
+    """子进程初始化: 构建检测器并预编译规则"""
+    global _worker_detector
+    _worker_detector = TechStackDetector()
+
+
+def _analyze_file_in_worker(job: tuple) -> Tuple[int, int]:
+    """子进程任务: 读取并分析单个文件，返回 (检测到的技术位, 检查过的技术位)"""
+    kind, file_path, size_limit = job
+    detector = _worker_detector
+    before = detector._detected_bits
+    detector._analyze_job(kind, file_path, size_limit)
+    return detector._scan_result(kind, before)
+
+
 def detect_tech_stack(directory: Path) -> Dict:
     """便捷函数: 检测技术栈"""
     detector = TechStackDetector()
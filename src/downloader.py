@@ -3,34 +3,62 @@
 """
 
 import asyncio
+import base64
+import contextlib
+import functools
+import hashlib
 import json
 import os
 import platform
-import subprocess
+import re
+import shutil
 import time
 from pathlib import Path
-from typing import Optional, Set, Dict, List
-from urllib.parse import urlparse, urljoin
+from collections import deque
+from typing import Optional, Set, Dict, List, Iterable, Iterator, Tuple
+from urllib.parse import urlparse, urljoin, unquote, urlsplit, urlunsplit, parse_qsl, urlencode
 import logging
 import atexit
 import signal
 import sys
 
+import psutil
 from playwright.async_api import async_playwright, Page, Browser, BrowserContext
-from bs4 import BeautifulSoup
-import requests
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+import aiohttp
+import lxml.html
+from lxml import etree
+
+try:
+    import orjson  # 可选: C 实现的 JSON 编码器
+except ImportError:
+    orjson = None
+
+try:
+    import xxhash  # 可选: 快速 64 位哈希，用于 URL 去重集合
+except ImportError:
+    xxhash = None
+
+try:
+    import aiodns  # noqa: F401  可选: 基于 c-ares 的异步 DNS 解析，不占用线程池
+    from aiohttp.resolver import AsyncResolver
+except ImportError:
+    AsyncResolver = None
 from tqdm import tqdm
 from colorama import Fore, Style
 
+from config import CACHE_DIR
 from .utils import (
     sanitize_filename, get_domain_from_url, url_to_filename,
-    is_same_domain, normalize_url, save_json, format_bytes
+    normalize_url, save_json, load_json, format_bytes,
+    clear_url_caches
 )
 
 # 导入新的管理模块
 from .thread_manager import get_thread_manager, shutdown_thread_manager
 from .process_cleaner import get_process_cleaner, cleanup_all_processes
 from .memory_manager import get_memory_manager, start_memory_monitoring, stop_memory_monitoring
+from .page_pool import PagePool
 from .operation_middleware import (
     get_middleware, operation, async_operation, operation_context, OperationStatus
 )
@@ -38,6 +66,136 @@ from .operation_middleware import (
 
 logger = logging.getLogger(__name__)
 
+# 在页面内批量下载资源: 使用页面自身的 fetch（携带登录 Cookie），Promise.all 并发请求，
+# 结果以 base64 返回（按 32KB 分段转换为二进制字符串，避免大文件展开参数时栈溢出）
+_BROWSER_FETCH_JS = """
+async (urls) => Promise.all(urls.map(async (url) => {
+    try {
+        const response = await fetch(url, {credentials: 'include'});
+        if (!response.ok) {
+            return {url, status: response.status, b64: null};
+        }
+        const bytes = new Uint8Array(await response.arrayBuffer());
+        let binary = '';
+        for (let i = 0; i < bytes.length; i += 0x8000) {
+            binary += String.fromCharCode.apply(null, bytes.subarray(i, i + 0x8000));
+        }
+        return {url, status: response.status, b64: btoa(binary)};
+    } catch (e) {
+        return {url, status: 0, b64: null};
+    }
+}))
+"""
+
+# CSS 中的 url() 引用，支持格式: url(xxx), url('xxx'), url("xxx")
+_CSS_URL_RE = re.compile(r'url\s*\(\s*["\']?([^)"\'\s]+)["\']?\s*\)', re.IGNORECASE)
+
+# data URI: data:[<mediatype>][;base64],<data>
+_DATA_URI_RE = re.compile(r'data:([^;,]+)?(;base64)?,(.+)')
+
+# 文档开头的 DOCTYPE 声明（保存页面时原样保留；lxml 会为没有 DOCTYPE 的文档补上默认值）
+_DOCTYPE_RE = re.compile(r'\s*(<!doctype[^>]*>)', re.IGNORECASE)
+
+# 每次 page.evaluate 批量下载的 URL 数
+BROWSER_FETCH_BATCH_SIZE = 32
+
+# Chrome/Edge 主进程名（Windows / macOS / Linux），用于检测浏览器是否正在运行
+CHROME_PROCESS_NAMES = frozenset({
+    'chrome.exe', 'msedge.exe',
+    'google chrome', 'microsoft edge',
+    'chrome', 'chromium', 'chromium-browser', 'google-chrome', 'msedge',
+})
+
+# CSS 中引用资源的扩展名 -> 资源类型（其余扩展名为 other）
+_EXT_RESOURCE_TYPES = {
+    **dict.fromkeys(('.woff', '.woff2', '.ttf', '.eot', '.otf'), 'fonts'),
+    **dict.fromkeys(('.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp', '.ico'), 'images'),
+}
+
+# 资源下载: 响应读缓冲 1MB，每次取出缓冲区中已到达的全部数据；文件写缓冲 1MB（减少 write 系统调用次数）
+READ_BUFFER_SIZE = 1 << 20
+WRITE_BUFFER_SIZE = 1 << 20
+
+
+def _url_key(url: str) -> int:
+    """URL 的 64 位哈希值（去重集合的键）"""
+    data = url.encode('utf-8', 'surrogatepass')
+    if xxhash is not None:
+        return xxhash.xxh3_64_intdigest(data)
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little')
+
+
+class _UrlKeySet:
+    """只保存 URL 64 位哈希值的集合
+
+    不保存完整的 URL 字符串（data URI 可能很长），每项只占一个整数；64 位哈希在爬取规模下碰撞可以忽略。
+    """
+
+    __slots__ = ('_keys',)
+
+    def __init__(self):
+        self._keys: Set[int] = set()
+
+    def add(self, url: str) -> None:
+        self._keys.add(_url_key(url))
+
+    def add_new(self, url: str) -> bool:
+        """加入 URL，返回是否为新 URL（检查和加入只计算一次哈希）"""
+        key = _url_key(url)
+        if key in self._keys:
+            return False
+        self._keys.add(key)
+        return True
+
+    def __contains__(self, url: str) -> bool:
+        return _url_key(url) in self._keys
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+@functools.lru_cache(maxsize=200_000)
+def _relative_path(output_dir: Path, from_url: str, to_url: str) -> str:
+    """计算从页面到资源的相对路径（同一页面和资源组合在整个爬取中会反复出现，结果缓存）"""
+    from_path = url_to_filename(from_url, output_dir)
+    to_path = url_to_filename(to_url, output_dir)
+
+    try:
+        rel_path = to_path.relative_to(from_path.parent)
+        return str(rel_path).replace('\\', '/')
+    except ValueError:
+        # 如果无法计算相对路径,返回绝对路径
+        return str(to_path).replace('\\', '/')
+
+
+def _open_for_write(file_path: Path):
+    """以大缓冲区打开待写入的资源文件，Linux 上提示内核按顺序访问"""
+    f = open(file_path, 'wb', buffering=WRITE_BUFFER_SIZE)
+    if hasattr(os, 'posix_fadvise'):
+        try:
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            pass
+    return f
+
+
+@functools.lru_cache(maxsize=65536)
+def _canon(url: str) -> str:
+    """规范化 URL（去掉片段、查询参数排序、scheme 和主机名转小写），同一资源的不同写法得到同一个 URL"""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, query, ''))
+
+
+def _canonical_url(url: str) -> str:
+    """返回用作去重和 resource_map 键的规范 URL（data URI 原样返回，不进入缓存）
+
+    只作为键使用: 实际请求仍用原始 URL（查询参数顺序可能影响签名），页面中的片段在改写链接时保留。
+    """
+    if url.startswith('data:'):
+        return url
+    return _canon(url)
+
 
 class WebsiteDownloader:
     """网站下载器 - 完整复刻网站资源"""
@@ -50,12 +208,16 @@ class WebsiteDownloader:
     ):
         self.start_url = url
         self.base_domain = get_domain_from_url(url)
+        # 起始 URL 规范化后的域名（页面中收集的 URL 都已规范化，同域判断直接与它比较）
+        self._start_domain = get_domain_from_url(_canonical_url(url))
         self.output_dir = output_dir
         self.config = config or {}
 
         # 下载统计
         self.visited_urls: Set[str] = set()
-        self.downloaded_files: Set[str] = set()
+        # 已放入爬取队列的 URL（同一链接出现在多个页面时只入队一次）
+        self._queued_urls = _UrlKeySet()
+        self.downloaded_files = _UrlKeySet()
         self.failed_downloads: List[Dict] = []
         self.stats = {
             'pages': 0,
@@ -70,13 +232,33 @@ class WebsiteDownloader:
         # 资源映射 (URL -> 本地路径)
         self.resource_map: Dict[str, Path] = {}
 
+        # 正在抓取的页面 -> 该页面的网络响应记录（页面处理完即移除）
+        self._page_resources: Dict[Page, deque] = {}
+
+        # 资源下载并发限制（所有页面和 CSS 共享）及共享的 HTTP 会话（首次下载时创建）
+        performance_config = self.config.get('performance', {})
+        self._max_resource_downloads = performance_config.get('parallel_resource_downloads', 5)
+        self._resource_semaphore = asyncio.Semaphore(self._max_resource_downloads)
+        self._http_session: Optional[aiohttp.ClientSession] = None
+
+        # 资源缓存: 重复下载同一网站时发送条件请求，304 时直接复用缓存内容
+        # 按域名保存在 CACHE_DIR/resources/<域名>/ 下（clone 每次使用新的输出目录，缓存不能放在输出目录中）
+        # 索引为 URL -> {etag, last_modified, size}，内容保存为 <sha1(url)>
+        self._cache_dir = CACHE_DIR / 'resources' / sanitize_filename(self._start_domain)
+        self._cache_index_path = self._cache_dir / 'cache_index.json'
+        self._cache_index: Optional[Dict[str, Dict]] = None
+
+        # 失败记录在发生时逐行追加到 failed_downloads.jsonl（首次失败时打开），中途中断也能看到已有的失败
+        self._failure_log_path = self.output_dir / 'failed_downloads.jsonl'
+        self._failure_log = None
+
         # 初始化管理器
         self._init_managers()
 
         # 注册清理函数
         self._register_cleanup_handlers()
 
-        logger.info(f"{Fore.GREEN}[WebsiteDownloader] 初始化完成: {url}{Style.RESET_ALL}")
+        logger.info("%s[WebsiteDownloader] 初始化完成: %s%s", Fore.GREEN, url, Style.RESET_ALL)
 
     def _init_managers(self):
         """初始化所有管理器"""
@@ -116,7 +298,7 @@ class WebsiteDownloader:
         self.middleware.show_details = middleware_config.get('show_details', True)
         self.middleware.color_output = middleware_config.get('color_output', True)
 
-        logger.info(f"{Fore.CYAN}[WebsiteDownloader] 管理器初始化完成{Style.RESET_ALL}")
+        logger.info("%s[WebsiteDownloader] 管理器初始化完成%s", Fore.CYAN, Style.RESET_ALL)
 
     def _register_cleanup_handlers(self):
         """注册清理处理函数"""
@@ -131,13 +313,13 @@ class WebsiteDownloader:
 
     def _on_memory_warning(self, memory_info: Dict[str, float]):
         """内存警告回调"""
-        logger.warning(f"{Fore.YELLOW}[WebsiteDownloader] 内存使用警告: {memory_info.get('percent', 0):.1f}%{Style.RESET_ALL}")
+        logger.warning("%s[WebsiteDownloader] 内存使用警告: %.1f%%%s", Fore.YELLOW, memory_info.get('percent', 0), Style.RESET_ALL)
         # 触发垃圾回收
         self.memory_manager.trigger_garbage_collection()
 
     def _on_memory_critical(self, memory_info: Dict[str, float]):
         """内存危险回调"""
-        logger.error(f"{Fore.RED}[WebsiteDownloader] 内存使用危险: {memory_info.get('percent', 0):.1f}%{Style.RESET_ALL}")
+        logger.error("%s[WebsiteDownloader] 内存使用危险: %.1f%%%s", Fore.RED, memory_info.get('percent', 0), Style.RESET_ALL)
         # 强制垃圾回收
         self.memory_manager.force_garbage_collection()
         # 清理所有缓存
@@ -154,29 +336,19 @@ class WebsiteDownloader:
             self.visited_urls -= set(urls_to_remove)
             cleaned_count += len(urls_to_remove)
 
-        # 清理资源映射中的无效条目
-        invalid_resources = []
-        for url, path in self.resource_map.items():
-            if not path.exists():
-                invalid_resources.append(url)
-
-        for url in invalid_resources:
-            del self.resource_map[url]
-            cleaned_count += 1
-
-        logger.debug(f"{Fore.CYAN}[WebsiteDownloader] 资源清理完成: {cleaned_count} 项{Style.RESET_ALL}")
+        logger.debug("%s[WebsiteDownloader] 资源清理完成: %s 项%s", Fore.CYAN, cleaned_count, Style.RESET_ALL)
         return cleaned_count
 
     def _signal_handler(self, signum, frame):
         """信号处理器"""
-        logger.info(f"{Fore.YELLOW}[WebsiteDownloader] 接收到信号 {signum}，开始清理...{Style.RESET_ALL}")
+        logger.info("%s[WebsiteDownloader] 接收到信号 %s，开始清理...%s", Fore.YELLOW, signum, Style.RESET_ALL)
         self._cleanup_on_exit()
         sys.exit(0)
 
     def _cleanup_on_exit(self):
         """退出时的清理函数"""
         try:
-            logger.info(f"{Fore.CYAN}[WebsiteDownloader] 执行退出清理...{Style.RESET_ALL}")
+            logger.info("%s[WebsiteDownloader] 执行退出清理...%s", Fore.CYAN, Style.RESET_ALL)
 
             process_config = self.config.get('process_cleanup', {})
 
@@ -188,9 +360,9 @@ class WebsiteDownloader:
                         result = self.process_cleaner.terminate_playwright_processes(
                             force=process_config.get('force_cleanup_timeout', 10) > 0
                         )
-                        logger.info(f"{Fore.GREEN}[WebsiteDownloader] Playwright 进程清理完成: {result}{Style.RESET_ALL}")
+                        logger.info("%s[WebsiteDownloader] Playwright 进程清理完成: %s%s", Fore.GREEN, result, Style.RESET_ALL)
                     except Exception as e:
-                        logger.warning(f"{Fore.YELLOW}[WebsiteDownloader] Playwright 进程清理失败: {e}{Style.RESET_ALL}")
+                        logger.warning("%s[WebsiteDownloader] Playwright 进程清理失败: %s%s", Fore.YELLOW, e, Style.RESET_ALL)
 
                 # ⚠️ 不再清理浏览器进程，避免误杀用户浏览器
                 # 之前的 cleanup_all_processes() 会杀死所有 Chrome 进程，非常危险
@@ -201,56 +373,30 @@ class WebsiteDownloader:
                 try:
                     self.process_cleaner.cleanup_temp_files(temp_dirs)
                 except Exception as e:
-                    logger.warning(f"{Fore.YELLOW}[WebsiteDownloader] 临时文件清理失败: {e}{Style.RESET_ALL}")
+                    logger.warning("%s[WebsiteDownloader] 临时文件清理失败: %s%s", Fore.YELLOW, e, Style.RESET_ALL)
 
             # 停止管理器
             try:
                 stop_memory_monitoring()
                 shutdown_thread_manager()
             except Exception as e:
-                logger.warning(f"{Fore.YELLOW}[WebsiteDownloader] 管理器停止失败: {e}{Style.RESET_ALL}")
+                logger.warning("%s[WebsiteDownloader] 管理器停止失败: %s%s", Fore.YELLOW, e, Style.RESET_ALL)
 
-            logger.info(f"{Fore.GREEN}[WebsiteDownloader] 退出清理完成{Style.RESET_ALL}")
+            logger.info("%s[WebsiteDownloader] 退出清理完成%s", Fore.GREEN, Style.RESET_ALL)
 
         except Exception as e:
-            logger.error(f"{Fore.RED}[WebsiteDownloader] 退出清理失败: {e}{Style.RESET_ALL}")
+            logger.error("%s[WebsiteDownloader] 退出清理失败: %s%s", Fore.RED, e, Style.RESET_ALL)
 
     def _is_chrome_running(self) -> bool:
-        """检测 Chrome/Edge 浏览器是否正在运行"""
-        system = platform.system()
-
+        """检测 Chrome/Edge 浏览器是否正在运行（遇到第一个匹配的进程即返回）"""
         try:
-            if system == "Windows":
-                # Windows: 使用 tasklist
-                result = subprocess.run(
-                    ['tasklist'],
-                    capture_output=True,
-                    text=True,
-                    creationflags=subprocess.CREATE_NO_WINDOW
-                )
-                output = result.stdout.lower()
-                return 'chrome.exe' in output or 'msedge.exe' in output
-
-            elif system == "Darwin":  # macOS
-                result = subprocess.run(
-                    ['ps', 'aux'],
-                    capture_output=True,
-                    text=True
-                )
-                output = result.stdout.lower()
-                return 'google chrome' in output or 'microsoft edge' in output
-
-            else:  # Linux
-                result = subprocess.run(
-                    ['ps', 'aux'],
-                    capture_output=True,
-                    text=True
-                )
-                output = result.stdout.lower()
-                return 'chrome' in output or 'chromium' in output
+            for proc in psutil.process_iter(['name']):
+                if (proc.info['name'] or '').lower() in CHROME_PROCESS_NAMES:
+                    return True
+            return False
 
         except Exception as e:
-            logger.warning(f"无法检测浏览器进程: {e}")
+            logger.warning("无法检测浏览器进程: %s", e)
             return False
 
     def _has_valid_browser_data(self, data_dir: Path) -> bool:
@@ -313,10 +459,10 @@ class WebsiteDownloader:
 
             # 使用完整的系统数据目录
             if base_path.exists():
-                logger.info(f"[OK] 使用系统 Chrome 完整数据: {base_path}")
+                logger.info("[OK] 使用系统 Chrome 完整数据: %s", base_path)
                 return str(base_path)
             else:
-                logger.warning(f"[WARN] 未找到系统 Chrome 数据, 将使用项目本地数据")
+                logger.warning("[WARN] 未找到系统 Chrome 数据, 将使用项目本地数据")
 
         if mode == 'playwright':
             # 使用项目根目录的 Playwright Profile
@@ -325,12 +471,12 @@ class WebsiteDownloader:
 
             # 先检查是否已有有效的浏览器数据
             if self._has_valid_browser_data(playwright_data_dir):
-                logger.info(f"{Fore.GREEN}[OK] 使用现有的项目浏览器数据: {playwright_data_dir}{Style.RESET_ALL}")
+                logger.info("%s[OK] 使用现有的项目浏览器数据: %s%s", Fore.GREEN, playwright_data_dir, Style.RESET_ALL)
                 return str(playwright_data_dir)
             else:
                 # 没有有效数据，创建新目录
                 playwright_data_dir.mkdir(parents=True, exist_ok=True)
-                logger.info(f"{Fore.CYAN}[INFO] 创建新的项目浏览器数据: {playwright_data_dir}{Style.RESET_ALL}")
+                logger.info("%s[INFO] 创建新的项目浏览器数据: %s%s", Fore.CYAN, playwright_data_dir, Style.RESET_ALL)
                 return str(playwright_data_dir)
 
     async def _wait_for_user_confirmation(self, url: str) -> bool:
@@ -356,10 +502,10 @@ class WebsiteDownloader:
         while True:
             choice = input(f"\n请确认 (y/n): ").strip().lower()
             if choice == 'y':
-                logger.info(f"{Fore.GREEN}[OK] 用户确认页面正确，开始下载...{Style.RESET_ALL}\n")
+                logger.info("%s[OK] 用户确认页面正确，开始下载...%s\n", Fore.GREEN, Style.RESET_ALL)
                 return True
             elif choice == 'n':
-                logger.warning(f"{Fore.YELLOW}[X] 用户取消操作{Style.RESET_ALL}")
+                logger.warning("%s[X] 用户取消操作%s", Fore.YELLOW, Style.RESET_ALL)
                 return False
             else:
                 print("请输入 'y' 或 'n'")
@@ -418,7 +564,7 @@ class WebsiteDownloader:
             return True
 
         except Exception as e:
-            logger.debug(f"页面稳定性检查失败: {e}")
+            logger.debug("页面稳定性检查失败: %s", e)
             return False
 
     async def _get_page_content_with_retry(self, page: Page, max_retries: Optional[int] = None) -> Optional[str]:
@@ -446,20 +592,20 @@ class WebsiteDownloader:
                     else:
                         logger.warning("获取到的页面内容为空")
                 else:
-                    logger.warning(f"页面不稳定，尝试 {attempt + 1}/{retry_attempts}")
+                    logger.warning("页面不稳定，尝试 %s/%s", attempt + 1, retry_attempts)
 
             except Exception as e:
                 error_msg = str(e)
                 if "navigating" in error_msg.lower():
-                    logger.warning(f"页面正在导航，尝试 {attempt + 1}/{retry_attempts}: {e}")
+                    logger.warning("页面正在导航，尝试 %s/%s: %s", attempt + 1, retry_attempts, e)
                 else:
-                    logger.warning(f"获取页面内容失败，尝试 {attempt + 1}/{retry_attempts}: {e}")
+                    logger.warning("获取页面内容失败，尝试 %s/%s: %s", attempt + 1, retry_attempts, e)
 
             # 如果不是最后一次尝试，等待一段时间再重试
             if attempt < retry_attempts - 1:
                 await asyncio.sleep(retry_delay / 1000)
 
-        logger.error(f"获取页面内容失败，已重试 {retry_attempts} 次")
+        logger.error("获取页面内容失败，已重试 %s 次", retry_attempts)
         return None
 
     @async_operation("网站下载", progress_total=100)
@@ -468,7 +614,7 @@ class WebsiteDownloader:
 
         with operation_context("网站下载", progress_total=100) as operation_id:
             try:
-                logger.info(f"开始下载网站: {self.start_url}")
+                logger.info("开始下载网站: %s", self.start_url)
                 self.middleware.log_step(operation_id, "初始化下载任务", "INFO", f"目标URL: {self.start_url}")
 
                 async with async_playwright() as p:
@@ -490,9 +636,9 @@ class WebsiteDownloader:
                     try:
                         browser_processes_before = self.process_cleaner.get_browser_processes()
                         browser_pids_before = {proc.pid for proc in browser_processes_before}
-                        logger.debug(f"启动前浏览器进程: {len(browser_pids_before)} 个")
+                        logger.debug("启动前浏览器进程: %s 个", len(browser_pids_before))
                     except Exception as e:
-                        logger.warning(f"获取启动前进程列表失败: {e}")
+                        logger.warning("获取启动前进程列表失败: %s", e)
 
                     # 如果使用系统 Chrome 数据
                     if use_system_chrome:
@@ -526,12 +672,12 @@ class WebsiteDownloader:
                                 viewport=self.config.get('viewport', {'width': 1920, 'height': 1080}),
                                 accept_downloads=True
                             )
-                            logger.info(f"{Fore.GREEN}[OK] 成功启动浏览器 (模式: {chrome_mode}){Style.RESET_ALL}")
+                            logger.info("%s[OK] 成功启动浏览器 (模式: %s)%s", Fore.GREEN, chrome_mode, Style.RESET_ALL)
                             self.middleware.log_step(operation_id, "浏览器启动成功", "SUCCESS",
                                                    f"模式: {chrome_mode}")
 
                         except Exception as e:
-                            logger.error(f"{Fore.RED}[X] 持久化上下文启动失败: {e}{Style.RESET_ALL}")
+                            logger.error("%s[X] 持久化上下文启动失败: %s%s", Fore.RED, e, Style.RESET_ALL)
 
                             # 自动回退到独立模式
                             print(f"\n{Fore.YELLOW}[WARN] 正在回退到独立浏览器模式...{Style.RESET_ALL}")
@@ -549,7 +695,7 @@ class WebsiteDownloader:
                         context = await browser.new_context(
                             viewport=self.config.get('viewport', {'width': 1920, 'height': 1080})
                         )
-                        logger.info(f"{Fore.GREEN}[OK] 成功启动独立浏览器{Style.RESET_ALL}")
+                        logger.info("%s[OK] 成功启动独立浏览器%s", Fore.GREEN, Style.RESET_ALL)
                         self.middleware.log_step(operation_id, "独立浏览器启动成功", "SUCCESS")
 
                     # 注册新启动的浏览器进程 PID（用于安全清理）
@@ -563,7 +709,7 @@ class WebsiteDownloader:
                         new_pids = browser_pids_after - browser_pids_before
                         for pid in new_pids:
                             self.process_cleaner.register_process(pid, f"Playwright浏览器进程")
-                            logger.info(f"{Fore.GREEN}[PID跟踪] 注册浏览器进程: {pid}{Style.RESET_ALL}")
+                            logger.info("%s[PID跟踪] 注册浏览器进程: %s%s", Fore.GREEN, pid, Style.RESET_ALL)
 
                         if new_pids:
                             self.middleware.log_step(operation_id, "注册浏览器进程PID", "SUCCESS",
@@ -572,7 +718,7 @@ class WebsiteDownloader:
                             logger.debug("未检测到新的浏览器进程（可能使用了持久化上下文）")
 
                     except Exception as e:
-                        logger.warning(f"{Fore.YELLOW}[PID跟踪] 注册浏览器进程失败: {e}{Style.RESET_ALL}")
+                        logger.warning("%s[PID跟踪] 注册浏览器进程失败: %s%s", Fore.YELLOW, e, Style.RESET_ALL)
 
                     try:
                         self.middleware.log_step(operation_id, "准备下载页面", "INFO")
@@ -601,16 +747,15 @@ class WebsiteDownloader:
                         self.middleware.log_step(operation_id, "开始下载网站内容", "PROGRESS")
 
                         # 下载主页和所有资源（复用已确认的页面）
-                        await self._download_recursive_with_context(
-                            context, self.start_url, depth=0, existing_page=confirmed_page,
-                            operation_id=operation_id
+                        await self._crawl_with_context(
+                            context, existing_page=confirmed_page, operation_id=operation_id
                         )
 
                         self.middleware.log_step(operation_id, "生成下载报告", "PROGRESS")
 
                         # 保存下载报告
                         report = self._generate_report()
-                        save_json(report, self.output_dir / 'download_report.json')
+                        await asyncio.to_thread(save_json, report, self.output_dir / 'download_report.json')
 
                         self.middleware.log_step(operation_id, "下载完成", "SUCCESS",
                                                f"页面: {self.stats['pages']}, CSS: {self.stats['css']}, 图片: {self.stats['images']}")
@@ -627,7 +772,7 @@ class WebsiteDownloader:
                                                           'total_size': format_bytes(self.stats['total_size'])
                                                       })
 
-                        logger.info(f"下载完成! 共 {self.stats['pages']} 个页面")
+                        logger.info("下载完成! 共 %s 个页面", self.stats['pages'])
                         return report
 
                     finally:
@@ -636,6 +781,12 @@ class WebsiteDownloader:
                         await context.close()
                         if browser:
                             await browser.close()
+                        await self._close_http_session()
+                        self._save_cache_index()
+                        self._close_failure_log()
+                        clear_url_caches()
+                        _canon.cache_clear()
+                        _relative_path.cache_clear()
 
                         self.middleware.log_step(operation_id, "浏览器资源已释放", "SUCCESS")
 
@@ -643,304 +794,425 @@ class WebsiteDownloader:
                 self.middleware.update_operation(operation_id, OperationStatus.FAILED,
                                               message=f"下载失败: {str(e)}",
                                               error=e)
-                logger.error(f"下载过程中发生错误: {e}")
+                logger.error("下载过程中发生错误: %s", e)
                 raise
 
-    async def _download_recursive_with_context(
+    async def _crawl_with_context(
         self,
         context: BrowserContext,
-        url: str,
-        depth: int,
         existing_page: Optional[Page] = None,
-        operation_id: Optional[str] = None
+        operation_id: Optional[str] = None,
+        start_url: Optional[str] = None,
+        start_depth: int = 0
     ) -> None:
-        """递归下载页面及其资源（使用 BrowserContext）
+        """从起始 URL 开始广度优先爬取（使用 BrowserContext）
+
+        待爬取的 (URL, 深度) 放入队列，由 concurrency 个工作协程并发处理，
+        每个页面发现的新链接再放回队列，队列处理完毕后结束。
 
         Args:
             context: 浏览器上下文
-            url: 要下载的URL
-            depth: 当前深度
             existing_page: 已存在的页面（用于复用已确认的页面，避免重新打开）
             operation_id: 操作ID，用于进度追踪
+            start_url: 开始爬取的 URL，None 时为 self.start_url
+            start_depth: 开始 URL 的深度
         """
-        # 检查深度限制
-        max_depth = self.config.get('max_depth', 3)
-        if depth > max_depth:
-            return
-
-        # 检查是否已访问
-        if url in self.visited_urls:
-            return
-
-        # 检查页面数量限制
-        max_pages = self.config.get('max_pages', 50)
-        if len(self.visited_urls) >= max_pages:
-            return
+        start_url = start_url or self.start_url
+        queue: asyncio.Queue = asyncio.Queue()
+        self._queued_urls.add(_canonical_url(start_url))
+        queue.put_nowait((start_url, start_depth, existing_page))
 
-        # 检查是否为同一域名
-        if not self.config.get('follow_external_links', False):
-            if not is_same_domain(url, self.start_url):
-                return
+        concurrency = max(1, int(self.config.get('concurrency', 8)))
 
-        self.visited_urls.add(url)
-        logger.info(f"正在下载 [{depth}]: {url}")
+        # 页面池: 抓取完成的页面重置后供后续 URL 复用（预先并发创建，数量不超过页面总数上限）
+        page_pool = PagePool(context, size=self.config.get('page_pool_size', concurrency))
+        await page_pool.init(min(page_pool.size, self.config.get('max_pages', 50)))
 
-        # 输出下载进度日志（如果有操作ID）
-        if operation_id:
-            self.middleware.log_step(operation_id, f"下载页面 ({len(self.visited_urls)}/{max_pages})", "PROGRESS",
-                                   f"URL: {url[:80]}...")
+        # 整个上下文只注册一个 response 监听器，按页面分发到各自的网络日志
+        context.on('response', self._on_context_response)
 
+        workers = [
+            asyncio.create_task(self._crawl_worker(page_pool, queue, operation_id))
+            for _ in range(concurrency)
+        ]
         try:
-            # 复用已存在的页面，或创建新页面
-            if existing_page:
-                page = existing_page
-                logger.info(f"��用已确认的页面: {url}")
-            else:
-                page = await context.new_page()
+            await queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            context.remove_listener('response', self._on_context_response)
+            await page_pool.close()
+
+    async def _crawl_worker(
+        self,
+        page_pool: PagePool,
+        queue: asyncio.Queue,
+        operation_id: Optional[str] = None
+    ) -> None:
+        """爬取工作协程: 不断从队列取出 URL 抓取，并把发现的链接放回队列"""
+        max_depth = self.config.get('max_depth', 3)
+        max_pages = self.config.get('max_pages', 50)
 
-            # 监听网络请求,捕获所有资源
-            resources = []
+        while True:
+            url, depth, existing_page = await queue.get()
+            try:
+                key = _canonical_url(url)
+                # 检查与标记已访问之间没有 await，多个工作协程之间无需加锁
+                if not self._should_visit(key, depth):
+                    continue
 
-            async def handle_response(response):
-                resources.append({
-                    'url': response.url,
-                    'status': response.status,
-                    'type': response.request.resource_type
-                })
+                self.visited_urls.add(key)
+                logger.info("正在下载 [%s]: %s", depth, url)
 
-            page.on('response', handle_response)
+                # 输出下载进度日志（如果有操作ID）
+                if operation_id:
+                    self.middleware.log_step(operation_id, f"下载页面 ({len(self.visited_urls)}/{max_pages})", "PROGRESS",
+                                           f"URL: {url[:80]}...")
 
-            # 如果是新创建的页面，需要访问URL
-            if not existing_page:
-                # 访问页面
-                await page.goto(url, timeout=self.config.get('timeout', 30000))
+                links = await self._fetch_page(page_pool, url, existing_page)
 
-                # 等待页面加载完成
-                await page.wait_for_load_state('networkidle')
+                # 超过深度限制或已入队的链接不再入队（检查与入队之间没有 await，无需加锁）
+                if depth < max_depth:
+                    for link in links:
+                        if self._queued_urls.add_new(_canonical_url(link)):
+                            queue.put_nowait((link, depth + 1, None))
 
-            # 获取页面HTML（使用重试机制）
-            html = await self._get_page_content_with_retry(page)
-            if html is None:
-                logger.error(f"无法获取页面内容: {url}")
-                return
+            except Exception as e:
+                self._record_page_failure(url, e)
+            finally:
+                queue.task_done()
 
-            # 保存 HTML 文件
-            html_path = self._save_html(url, html)
-            self.stats['pages'] += 1
+    def _should_visit(self, url: str, depth: int) -> bool:
+        """检查深度、是否已访问、页面数量和域名限制"""
+        if depth > self.config.get('max_depth', 3):
+            return False
 
-            # 直接下载页面资源
-            await self._download_page_resources(page, url, html, resources)
+        if url in self.visited_urls:
+            return False
 
-            # 查找并下载链接的页面
-            links = await self._extract_links(page, url)
-            for link in links:
-                await self._download_recursive_with_context(
-                    context, link, depth + 1, existing_page=None, operation_id=operation_id
-                )
+        if len(self.visited_urls) >= self.config.get('max_pages', 50):
+            return False
 
-            # 只关闭新创建的页面，不关闭复用的页面
-            if not existing_page:
-                await page.close()
+        if not self.config.get('follow_external_links', False):
+            if get_domain_from_url(url) != self._start_domain:
+                return False
 
-        except Exception as e:
-            # 区分不同类型的错误，避免误导性提示
-            error_msg = str(e)
-            if 'Incoming markup is of an invalid type' in error_msg:
-                # 这是代码逻辑问题，但通常不影响结果（降为debug）
-                logger.debug(f"页面处理警告 {url}: BeautifulSoup类型错误（可忽略）")
-            else:
-                # 其他真正的下载错误
-                logger.error(f"下载失败 {url}: {e}")
+        return True
 
-            self.failed_downloads.append({
-                'url': url,
-                'error': str(e),
-                'severity': 'info' if 'Incoming markup' in error_msg else 'error'
-            })
+    def _record_failure(self, entry: Dict) -> None:
+        """记录一条下载失败，并追加写入失败日志"""
+        self.failed_downloads.append(entry)
 
-    async def _download_recursive(
+        try:
+            if self._failure_log is None:
+                self._failure_log_path.parent.mkdir(parents=True, exist_ok=True)
+                self._failure_log = open(self._failure_log_path, 'wb')
+            if orjson is not None:
+                line = orjson.dumps(entry)
+            else:
+                line = json.dumps(entry, ensure_ascii=False).encode('utf-8')
+            self._failure_log.write(line + b'\n')
+        except (OSError, TypeError) as e:
+            logger.debug("写入失败日志失败: %s", e)
+
+    def _close_failure_log(self) -> None:
+        """关闭失败日志文件"""
+        if self._failure_log is not None:
+            self._failure_log.close()
+            self._failure_log = None
+
+    def _record_page_failure(self, url: str, error: Exception) -> None:
+        """记录页面下载失败"""
+        logger.error("下载失败 %s: %s", url, error)
+
+        self._record_failure({
+            'url': url,
+            'error': str(error),
+            'severity': 'error'
+        })
+
+    async def _fetch_page(
         self,
-        browser: Browser,
+        page_pool: PagePool,
         url: str,
-        depth: int
-    ) -> None:
-        """递归下载页面及其资源（使用 Browser，兼容旧代码）"""
-        # 检查深度限制
-        max_depth = self.config.get('max_depth', 3)
-        if depth > max_depth:
-            return
+        existing_page: Optional[Page] = None
+    ) -> List[str]:
+        """抓取单个页面: 保存 HTML 并下载页面资源
 
-        # 检查是否已访问
-        if url in self.visited_urls:
-            return
+        Returns:
+            页面中待继续爬取的链接列表
+        """
+        # 复用已确认的页面（保持原样，不归还到池中），或从页面池中取一个页面
+        if existing_page:
+            logger.info("复用已确认的页面: %s", url)
+            page_source = contextlib.nullcontext(existing_page)
+        else:
+            page_source = page_pool.acquire()
 
-        # 检查页面数量限制
-        max_pages = self.config.get('max_pages', 50)
-        if len(self.visited_urls) >= max_pages:
-            return
+        async with page_source as page:
+            # 记录页面的网络响应（由上下文级的 response 监听器写入）
+            resources = self._start_network_log(page)
 
-        # 检查是否为同一域名
-        if not self.config.get('follow_external_links', False):
-            if not is_same_domain(url, self.start_url):
-                return
+            try:
+                # 如果是池中的页面，需要访问URL
+                if not existing_page:
+                    # 访问页面
+                    await page.goto(url, timeout=self.config.get('timeout', 30000))
 
-        self.visited_urls.add(url)
-        logger.info(f"正在下载 [{depth}]: {url}")
+                    # 等待页面加载完成
+                    await self._wait_for_network_idle(page)
 
-        try:
-            # 创建新页面
-            page = await browser.new_page(
-                viewport=self.config.get('viewport', {'width': 1920, 'height': 1080})
-            )
+                # 获取页面HTML（使用重试机制）
+                html = await self._get_page_content_with_retry(page)
+                if html is None:
+                    logger.error("无法获取页面内容: %s", url)
+                    return []
 
-            # 监听网络请求,捕获所有资源
-            resources = []
+                # 保存页面、下载资源，返回链接的页面（由调用方放入爬取队列）
+                return await self._process_page(page, url, html, resources)
 
-            async def handle_response(response):
-                resources.append({
-                    'url': response.url,
-                    'status': response.status,
-                    'type': response.request.resource_type
-                })
+            finally:
+                self._page_resources.pop(page, None)
+
+    async def _wait_for_network_idle(self, page: Page) -> None:
+        """等待网络空闲，最多等待 network_idle_cap 毫秒
 
-            page.on('response', handle_response)
+        统计脚本、长轮询较多的页面可能迟迟达不到 networkidle，超时后直接处理已加载的页面，
+        不让单个慢页面拖住整个爬取。
+        """
+        idle_cap = self.config.get('network_idle_cap', 8000)
+        try:
+            await page.wait_for_load_state('networkidle', timeout=idle_cap)
+        except PlaywrightTimeoutError:
+            logger.debug("等待网络空闲超时 (%sms)，继续处理页面: %s", idle_cap, page.url)
+
+    def _start_network_log(self, page: Page) -> deque:
+        """开始记录页面的网络响应，返回有界的 (URL, 状态码, 资源类型) 记录"""
+        resources = deque(maxlen=self.config.get('max_resources_per_page', 5000))
+        self._page_resources[page] = resources
+        return resources
+
+    def _on_context_response(self, response) -> None:
+        """上下文级 response 事件回调: 把响应记录到所属页面的网络日志（未在抓取中的页面忽略）"""
+        try:
+            page = response.frame.page
+        except Exception:
+            # Service Worker 等请求没有所属页面
+            return
 
-            # 访问页面
-            await page.goto(url, timeout=self.config.get('timeout', 30000))
+        resources = self._page_resources.get(page)
+        if resources is not None:
+            resources.append((response.url, response.status, response.request.resource_type))
 
-            # 等待页面加载完成
-            await page.wait_for_load_state('networkidle', timeout=10000)
+    async def _download_recursive(
+        self,
+        browser: Browser,
+        url: str,
+        depth: int
+    ) -> None:
+        """从指定页面开始下载页面及其资源（使用 Browser，兼容旧代码）
 
-            # 获取渲染后的 HTML
-            html = await page.content()
+        与 _crawl_with_context 使用同一个爬取队列，不再逐层递归。
+        """
+        context = await browser.new_context(
+            viewport=self.config.get('viewport', {'width': 1920, 'height': 1080})
+        )
+        try:
+            await self._crawl_with_context(context, start_url=url, start_depth=depth)
+        finally:
+            await context.close()
 
-            # 保存 HTML 文件
-            html_path = self._save_html(url, html)
-            self.stats['pages'] += 1
+    async def _process_page(self, page: Page, url: str, html: str, network_resources: Iterable[tuple]) -> List[str]:
+        """处理页面 HTML: 只解析、遍历一次，提取链接和资源后保存页面并下载资源
 
-            # 提取并下载所有资源
-            await self._download_page_resources(page, url, html, resources)
+        Returns:
+            页面中待继续爬取的链接列表
+        """
+        # 解析和遍历放到线程中，不阻塞其他页面的抓取（lxml 解析时释放 GIL，多个页面可并行解析）
+        # 网络响应记录仍在被事件循环追加，先在此复制一份
+        tree, links, download_tasks, rewrites = await asyncio.to_thread(
+            self._parse_and_scan, html, url, list(network_resources)
+        )
+
+        # 保存 HTML 文件（序列化和写文件放到线程中，不阻塞其他页面和资源的下载）
+        doctype_match = _DOCTYPE_RE.match(html)
+        await asyncio.to_thread(
+            self._save_html, url, tree, rewrites, doctype_match.group(1) if doctype_match else None
+        )
+        self.stats['pages'] += 1
+
+        # 直接下载页面资源
+        await self._download_page_resources(page, download_tasks)
 
-            # 提取链接并递归下载
-            links = self._extract_links(html, url)
-            for link in links:
-                await self._download_recursive(browser, link, depth + 1)
+        return links
 
-            await page.close()
+    def _parse_and_scan(self, html: str, page_url: str, network_resources: List[tuple]) -> tuple:
+        """解析页面，并一次遍历同时提取链接、资源和待改写的链接属性（保存时才就地改写文档树）
 
-        except Exception as e:
-            # 区分不同类型的错误，避免误导性提示
-            error_msg = str(e)
-            if 'Incoming markup is of an invalid type' in error_msg:
-                # 这是代码逻辑问题，但通常不影响结果（降为debug）
-                logger.debug(f"页面处理警告 {url}: BeautifulSoup类型错误（可忽略）")
-            else:
-                # 其他真正的下载错误
-                logger.error(f"下载失败 {url}: {e}")
+        Returns:
+            (文档树, 待爬取链接列表, 下载任务列表, 待改写的链接属性列表)
+        """
+        tree = self._parse_html(html)
+        links, download_tasks, rewrites = self._scan_page(tree, page_url, network_resources)
+        return tree, links, download_tasks, rewrites
 
-            self.failed_downloads.append({
-                'url': url,
-                'error': str(e),
-                'severity': 'info' if 'Incoming markup' in error_msg else 'error'
-            })
+    @staticmethod
+    def _parse_html(html: str) -> lxml.html.HtmlElement:
+        """用 lxml（C 实现）解析 HTML 文档"""
+        return lxml.html.document_fromstring(html)
 
-    async def _download_page_resources(
+    @staticmethod
+    def _walk_html(tree: lxml.html.HtmlElement) -> Iterator[Tuple[str, str, lxml.html.HtmlElement]]:
+        """单次遍历文档树，产出页面中所有引用: (类型, 属性值/文本, 元素)
+
+        类型: link/script/img/srcset/a 为对应标签的 href/src/srcset 属性，
+        style 为 <style> 标签内容，inline_style 为元素的 style 属性。
+        """
+        for tag in tree.iter(etree.Element):  # 所有元素（跳过注释等节点）
+            name = tag.tag
+            if name == 'link':
+                value = tag.get('href')
+                if value is not None:
+                    yield 'link', value, tag
+            elif name == 'script':
+                value = tag.get('src')
+                if value is not None:
+                    yield 'script', value, tag
+            elif name == 'img':
+                value = tag.get('src')
+                if value is not None:
+                    yield 'img', value, tag
+                value = tag.get('srcset')
+                if value is not None:
+                    yield 'srcset', value, tag
+            elif name == 'a':
+                value = tag.get('href')
+                if value is not None:
+                    yield 'a', value, tag
+            elif name == 'style':
+                if tag.text:
+                    yield 'style', tag.text, tag
+
+            style_attr = tag.get('style')
+            if style_attr:
+                yield 'inline_style', style_attr, tag
+
+    def _scan_page(
         self,
-        page: Page,
+        tree: lxml.html.HtmlElement,
         page_url: str,
-        html: str,
-        network_resources: List[Dict]
-    ) -> None:
-        """并发下载页面的所有资源"""
-        soup = BeautifulSoup(html, 'html.parser')
-
-        # 收集所有需要下载的资源
-        download_tasks = []
-
-        # 收集 CSS 文件
-        if self.config.get('download_css', True):
-            for tag in soup.find_all('link', rel='stylesheet'):
-                if tag.get('href'):
-                    css_url = normalize_url(tag['href'], page_url)
-                    download_tasks.append((css_url, 'css', page_url))
-
-        # 收集 JavaScript 文件
-        if self.config.get('download_js', True):
-            for tag in soup.find_all('script', src=True):
-                js_url = normalize_url(tag['src'], page_url)
-                download_tasks.append((js_url, 'js', page_url))
-
-        # 收集图片
-        if self.config.get('download_images', True):
-            for tag in soup.find_all('img', src=True):
-                img_url = normalize_url(tag['src'], page_url)
-                download_tasks.append((img_url, 'images', page_url))
-
-            # srcset 属性中的图片
-            for tag in soup.find_all('img', srcset=True):
-                srcset = tag['srcset']
-                for src in srcset.split(','):
-                    img_url = src.strip().split()[0]
-                    img_url = normalize_url(img_url, page_url)
-                    download_tasks.append((img_url, 'images', page_url))
-
-        # 收集字体
-        if self.config.get('download_fonts', True):
-            # 从网络资源中提取字体
-            for resource in network_resources:
-                if resource['type'] == 'font':
-                    download_tasks.append((resource['url'], 'fonts', page_url))
-
-        # 收集内联样式中的资源
-        if self.config.get('download_images', True):
-            for tag in soup.find_all(True):  # 查找所有标签
-                style_attr = tag.get('style')
-                if style_attr:
-                    # 提取内联样式中的URL
-                    urls = self._parse_css_urls(style_attr, page_url)
-                    for url in urls:
-                        # 根据文件扩展名判断资源类型
-                        ext = url.lower().split('?')[0].split('.')[-1]
-                        if ext in ['png', 'jpg', 'jpeg', 'gif', 'svg', 'webp', 'ico']:
-                            download_tasks.append((url, 'images', page_url))
-                        elif ext in ['woff', 'woff2', 'ttf', 'eot', 'otf']:
-                            download_tasks.append((url, 'fonts', page_url))
-
-        # 收集 <style> 标签中的资源
-        for style_tag in soup.find_all('style'):
-            if style_tag.string:
-                css_content = str(style_tag.string)
+        network_resources: Iterable[tuple]
+    ) -> Tuple[List[str], List[tuple], List[tuple]]:
+        """遍历一次文档树，收集页面链接、需要下载的资源和可改写为本地路径的链接属性
+
+        Returns:
+            (待爬取链接列表, [(URL, 资源类型, 页面URL), ...], [(元素, 属性名, 原始URL), ...])
+        """
+        download_css = self.config.get('download_css', True)
+        download_js = self.config.get('download_js', True)
+        download_images = self.config.get('download_images', True)
+        follow_external = self.config.get('follow_external_links', False)
+
+        links: Dict[str, str] = {}
+        rewrites: List[tuple] = []
+        # 按资源类别分桶，最后按 CSS、JS、图片、字体、内联样式、<style> 的顺序合并
+        css_tasks, js_tasks, image_tasks, inline_tasks, style_tasks = [], [], [], [], []
+
+        for kind, value, tag in self._walk_html(tree):
+            if kind == 'link':
+                url = normalize_url(value, page_url)
+                rewrites.append((tag, 'href', url))
+                if download_css and value and 'stylesheet' in (tag.get('rel') or '').split():
+                    css_tasks.append((url, 'css', page_url))
+
+            elif kind == 'script':
+                url = normalize_url(value, page_url)
+                rewrites.append((tag, 'src', url))
+                if download_js:
+                    js_tasks.append((url, 'js', page_url))
+
+            elif kind == 'img':
+                url = normalize_url(value, page_url)
+                rewrites.append((tag, 'src', url))
+                if download_images:
+                    image_tasks.append((url, 'images', page_url))
+
+            elif kind == 'srcset':
+                # srcset 属性中的图片
+                if download_images:
+                    for src in value.split(','):
+                        parts = src.split()
+                        if parts:
+                            image_tasks.append((normalize_url(parts[0], page_url), 'images', page_url))
+
+            elif kind == 'a':
+                url = normalize_url(value, page_url)
+                rewrites.append((tag, 'href', url))
+
+                # 只提取同域名的 HTTP 链接（按规范 URL 去重，同一页面的不同片段只保留第一个链接）
+                if not url.startswith(('http://', 'https://')):
+                    continue
+                key = _canonical_url(url)
+                if not follow_external and get_domain_from_url(key) != self._start_domain:
+                    continue
+                if key not in self.visited_urls:
+                    links.setdefault(key, url)
+
+            elif kind == 'inline_style':
+                # 提取内联样式中的URL（只下载图片和字体）
+                if download_images:
+                    for url in self._parse_css_urls(value, page_url):
+                        resource_type = self._guess_resource_type(url)
+                        if resource_type != 'other':
+                            inline_tasks.append((url, resource_type, page_url))
+
+            elif kind == 'style':
                 # 提取 <style> 标签中的所有 URL
-                urls = self._parse_css_urls(css_content, page_url)
-                for url in urls:
-                    # 根据文件扩展名判断资源类型
-                    ext = url.lower().split('?')[0].split('.')[-1]
-
-                    if ext in ['woff', 'woff2', 'ttf', 'eot', 'otf']:
-                        resource_type = 'fonts'
-                    elif ext in ['png', 'jpg', 'jpeg', 'gif', 'svg', 'webp', 'ico']:
-                        resource_type = 'images'
-                    else:
-                        resource_type = 'other'
+                for url in self._parse_css_urls(value, page_url):
+                    style_tasks.append((url, self._guess_resource_type(url), page_url))
+
+        # 从网络资源中提取字体
+        font_tasks = []
+        if self.config.get('download_fonts', True):
+            font_tasks = [
+                (resource_url, 'fonts', page_url)
+                for resource_url, _, resource_type in network_resources
+                if resource_type == 'font'
+            ]
+
+        download_tasks = css_tasks + js_tasks + image_tasks + font_tasks + inline_tasks + style_tasks
+        return list(links.values()), download_tasks, rewrites
+
+    @staticmethod
+    def _guess_resource_type(url: str) -> str:
+        """根据文件扩展名判断 CSS 中引用的资源类型"""
+        ext = os.path.splitext(url.partition('?')[0])[1]
+        return _EXT_RESOURCE_TYPES.get(ext.lower(), 'other')
+
+    async def _download_page_resources(self, page: Optional[Page], download_tasks: List[tuple]) -> None:
+        """并发下载页面的所有资源"""
+        # 去掉本页重复的以及其他页面已下载的资源（URL 已规范化），重复资源不再创建下载任务
+        download_tasks = self._pending_resource_tasks(download_tasks)
 
-                    download_tasks.append((url, resource_type, page_url))
+        # 同源资源优先在页面内批量下载（复用页面的登录状态），失败的再由 HTTP 会话下载
+        if download_tasks and page is not None and self.config.get('browser_fetch', True):
+            await self._download_resources_in_browser(page, download_tasks)
+            download_tasks = self._pending_resource_tasks(download_tasks)
 
-        # 并发下载所有资源（使用 Semaphore 限制并发数）
+        # 并发下载所有资源（并发数由 _download_resource 内共享的信号量限制）
         if download_tasks:
-            performance_config = self.config.get('performance', {})
-            max_concurrent = performance_config.get('parallel_resource_downloads', 5)
-            semaphore = asyncio.Semaphore(max_concurrent)
+            max_concurrent = self._max_resource_downloads
 
             async def download_with_limit(url: str, resource_type: str, base_url: Optional[str]):
-                """带并发限制的下载"""
-                async with semaphore:
-                    try:
-                        await self._download_resource(url, resource_type, base_url)
-                    except Exception as e:
-                        # 单个资源失败不影响其他资源
-                        logger.debug(f"资源下载失败 {url}: {e}")
+                """下载单个资源，失败不影响其他资源"""
+                try:
+                    await self._download_resource(url, resource_type, base_url)
+                except Exception as e:
+                    # 单个资源失败不影响其他资源
+                    logger.debug("资源下载失败 %s: %s", url, e)
 
-            logger.info(f"{Fore.CYAN}[并发下载] 准备下载 {len(download_tasks)} 个资源（并发数: {max_concurrent}）{Style.RESET_ALL}")
+            logger.info("%s[并发下载] 准备下载 %s 个资源（并发数: %s）%s", Fore.CYAN, len(download_tasks), max_concurrent, Style.RESET_ALL)
 
             # 如果在操作上下文中，输出日志
             # 注意：这里没有 operation_id，所以用全局中间件
@@ -965,12 +1237,57 @@ class WebsiteDownloader:
             middleware.log_step("download", f"资源下载完成", "SUCCESS",
                               f"成功下载 {len(download_tasks)} 个资源")
 
+    def _pending_resource_tasks(self, download_tasks: List[tuple]) -> List[tuple]:
+        """按规范 URL 去重并过滤掉已下载的资源（同一资源保留第一次出现的任务）"""
+        pending: Dict[str, tuple] = {}
+        for task in download_tasks:
+            key = _canonical_url(task[0])
+            if key not in self.downloaded_files and key not in pending:
+                pending[key] = task
+        return list(pending.values())
+
+    async def _get_http_session(self) -> aiohttp.ClientSession:
+        """获取共享的 HTTP 会话（首次使用时创建，连接和 DNS 缓存在所有资源下载间复用）
+
+        每个主机名在会话内只解析一次（DNS 缓存 10 分钟）；安装了 aiodns 时使用异步解析器。
+        连接保持 keep-alive，空闲连接保留 30 秒，页面之间的资源下载可复用已建立的 TCP/TLS 连接。
+        """
+        if self._http_session is None or self._http_session.closed:
+            # 使用配置的浏览器 User-Agent，避免资源请求因默认的 aiohttp UA 被拦截
+            headers = {}
+            if self.config.get('user_agent'):
+                headers['User-Agent'] = self.config['user_agent']
+
+            connector = aiohttp.TCPConnector(
+                limit=32,
+                limit_per_host=16,
+                keepalive_timeout=30,
+                use_dns_cache=True,
+                ttl_dns_cache=600,
+                resolver=AsyncResolver() if AsyncResolver is not None else None
+            )
+            self._http_session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=30),
+                read_bufsize=READ_BUFFER_SIZE,
+                headers=headers
+            )
+        return self._http_session
+
+    async def _close_http_session(self) -> None:
+        """关闭共享的 HTTP 会话"""
+        if self._http_session is not None:
+            await self._http_session.close()
+            self._http_session = None
+
     async def _download_resource(self, url: str, resource_type: str, base_url: Optional[str] = None) -> None:
-        """下载单个资源文件（支持并发）"""
-        if url in self.downloaded_files:
-            return
+        """下载单个资源文件（支持并发）
 
-        self.downloaded_files.add(url)
+        去重、本地路径和缓存都以规范 URL 为键，请求使用原始 URL。
+        """
+        key = _canonical_url(url)
+        if not self.downloaded_files.add_new(key):
+            return
 
         try:
             # 处理 data URI (如 data:image/svg+xml;base64,...)
@@ -978,39 +1295,52 @@ class WebsiteDownloader:
                 await self._download_data_uri(url, resource_type)
                 return
 
-            # 使用 asyncio.to_thread 在线程池中执行同步 HTTP 请求
-            # 这样可以真正并发下载，不阻塞事件循环
-            response = await asyncio.to_thread(
-                requests.get, url, timeout=30, stream=True
-            )
-            response.raise_for_status()
-
-            # 保存文件
-            file_path = url_to_filename(url, self.output_dir)
-            file_path.parent.mkdir(parents=True, exist_ok=True)
-
-            with open(file_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
-
-            # 更新统计
-            file_size = file_path.stat().st_size
-            self.stats[resource_type] += 1
-            self.stats['total_size'] += file_size
-            self.resource_map[url] = file_path
-
-            logger.debug(f"已下载 {resource_type}: {url}")
+            file_path = url_to_filename(key, self.output_dir)
+
+            # 有缓存时发送条件请求
+            use_cache = self.config.get('resource_cache', True)
+            cache_entry = self._get_cache_entry(key) if use_cache else None
+            headers = {}
+            if cache_entry is not None:
+                if cache_entry.get('etag'):
+                    headers['If-None-Match'] = cache_entry['etag']
+                if cache_entry.get('last_modified'):
+                    headers['If-Modified-Since'] = cache_entry['last_modified']
+
+            # 只在 HTTP 请求期间占用信号量，CSS 内引用资源的下载在释放后进行，避免嵌套占用导致死锁
+            async with self._resource_semaphore:
+                session = await self._get_http_session()
+                async with session.get(url, headers=headers) as response:
+                    if response.status == 304 and cache_entry is not None:
+                        # 资源未变化，从缓存复制（输出目录中已有相同大小的文件时直接跳过）
+                        file_size = await asyncio.to_thread(
+                            self._restore_from_cache, key, file_path, cache_entry.get('size')
+                        )
+                    else:
+                        response.raise_for_status()
+
+                        # 流式保存文件
+                        file_path.parent.mkdir(parents=True, exist_ok=True)
+                        file_size = 0
+                        with _open_for_write(file_path) as f:
+                            async for chunk in response.content.iter_any():
+                                f.write(chunk)
+                                file_size += len(chunk)
+
+                        if use_cache:
+                            await asyncio.to_thread(
+                                self._store_in_cache, key, file_path, file_size,
+                                response.headers.get('ETag'), response.headers.get('Last-Modified')
+                            )
 
-            # 如果是CSS文件，解析并下载其中引用的资源
-            if resource_type == 'css' and base_url:
-                await self._process_css_resources(file_path, url)
+            await self._record_resource(url, resource_type, file_path, file_size, base_url)
 
-        except requests.exceptions.HTTPError as e:
+        except aiohttp.ClientResponseError as e:
             # 区分404和其他HTTP错误
-            if '404' in str(e):
+            if e.status == 404:
                 # 404错误很常见（失效链接），降为debug级别
-                logger.debug(f"资源不存在 (404) {url[:80]}")
-                self.failed_downloads.append({
+                logger.debug("资源不存在 (404) %s", url[:80])
+                self._record_failure({
                     'url': url,
                     'type': resource_type,
                     'error': '404 Not Found',
@@ -1018,17 +1348,17 @@ class WebsiteDownloader:
                 })
             else:
                 # 其他HTTP错误（403、500等）是真正的问题
-                logger.warning(f"资源下载失败 {url[:80]}: {e}")
-                self.failed_downloads.append({
+                logger.warning("资源下载失败 %s: %s", url[:80], e)
+                self._record_failure({
                     'url': url,
                     'type': resource_type,
                     'error': str(e),
                     'severity': 'warning'
                 })
-        except requests.exceptions.RequestException as e:
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             # 网络错误（超时、连接失败等）
-            logger.warning(f"网络错误 {url[:80]}: {e}")
-            self.failed_downloads.append({
+            logger.warning("网络错误 %s: %s", url[:80], e)
+            self._record_failure({
                 'url': url,
                 'type': resource_type,
                 'error': str(e),
@@ -1036,20 +1366,180 @@ class WebsiteDownloader:
             })
         except Exception as e:
             # 其他未预期的错误
-            logger.warning(f"资源下载失败 {url[:80]}: {e}")
-            self.failed_downloads.append({
+            logger.warning("资源下载失败 %s: %s", url[:80], e)
+            self._record_failure({
                 'url': url,
                 'type': resource_type,
                 'error': str(e),
                 'severity': 'warning'
             })
 
+    def _get_cache_index(self) -> Dict[str, Dict]:
+        """获取资源缓存索引（首次使用时从磁盘加载）"""
+        if self._cache_index is None:
+            try:
+                self._cache_index = load_json(self._cache_index_path) or {}
+            except Exception as e:
+                logger.warning("读取资源缓存索引失败: %s", e)
+                self._cache_index = {}
+        return self._cache_index
+
+    def _cache_body_path(self, url: str) -> Path:
+        """资源在缓存目录中的内容文件路径"""
+        return self._cache_dir / hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+    def _get_cache_entry(self, url: str) -> Optional[Dict]:
+        """查找资源的缓存条目（内容文件缺失时视为未缓存）"""
+        entry = self._get_cache_index().get(url)
+        if entry is None or not self._cache_body_path(url).exists():
+            return None
+        return entry
+
+    def _restore_from_cache(self, url: str, file_path: Path, expected_size: Optional[int] = None) -> int:
+        """把缓存内容复制到目标路径，返回文件大小
+
+        上次下载的文件仍在且大小与缓存记录一致时不再复制。
+        """
+        if expected_size is not None:
+            try:
+                if file_path.stat().st_size == expected_size:
+                    return expected_size
+            except OSError:
+                pass
+
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(self._cache_body_path(url), file_path)
+        return file_path.stat().st_size
+
+    def _store_in_cache(
+        self,
+        url: str,
+        file_path: Path,
+        file_size: int,
+        etag: Optional[str],
+        last_modified: Optional[str]
+    ) -> None:
+        """保存资源内容和验证头到缓存（没有 ETag/Last-Modified 的资源无法条件请求，不缓存）"""
+        index = self._get_cache_index()
+        if not etag and not last_modified:
+            index.pop(url, None)
+            return
+
+        try:
+            self._cache_dir.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(file_path, self._cache_body_path(url))
+        except OSError as e:
+            logger.debug("写入资源缓存失败 %s: %s", url[:80], e)
+            index.pop(url, None)
+            return
+
+        index[url] = {'etag': etag, 'last_modified': last_modified, 'size': file_size}
+
+    def _save_cache_index(self) -> None:
+        """原子写入资源缓存索引（先写临时文件再替换）"""
+        if self._cache_index is None:
+            return
+
+        tmp_path = self._cache_index_path.with_suffix('.tmp')
+        try:
+            save_json(self._cache_index, tmp_path)
+            os.replace(tmp_path, self._cache_index_path)
+        except Exception as e:
+            logger.warning("写入资源缓存索引失败: %s", e)
+
+    async def _record_resource(
+        self,
+        url: str,
+        resource_type: str,
+        file_path: Path,
+        file_size: int,
+        base_url: Optional[str]
+    ) -> None:
+        """记录已保存的资源，CSS 文件继续下载其中引用的资源"""
+        # 更新统计
+        self.stats[resource_type] += 1
+        self.stats['total_size'] += file_size
+        self.resource_map[_canonical_url(url)] = file_path
+
+        logger.debug("已下载 %s: %s", resource_type, url)
+
+        # 如果是CSS文件，解析并下载其中引用的资源
+        if resource_type == 'css' and base_url:
+            await self._process_css_resources(file_path, url)
+
+    async def _batch_fetch_in_browser(self, page: Page, urls: List[str]) -> Dict[str, bytes]:
+        """在页面内用 fetch + Promise.all 批量下载资源
+
+        Returns:
+            成功下载的 URL -> 文件内容（失败的 URL 不在结果中）
+        """
+        results: Dict[str, bytes] = {}
+        for start in range(0, len(urls), BROWSER_FETCH_BATCH_SIZE):
+            batch = urls[start:start + BROWSER_FETCH_BATCH_SIZE]
+            try:
+                items = await page.evaluate(_BROWSER_FETCH_JS, batch)
+            except Exception as e:
+                # 页面已关闭或导航中，整批交给 HTTP 会话下载
+                logger.debug("页面内批量下载失败: %s", e)
+                continue
+
+            for item in items:
+                if item.get('b64') is not None:
+                    results[item['url']] = base64.b64decode(item['b64'])
+        return results
+
+    async def _download_resources_in_browser(self, page: Page, download_tasks: List[tuple]) -> None:
+        """在页面内下载同源资源（CSS/JS/图片/字体），成功的资源标记为已下载"""
+        # 原始 URL -> (规范 URL, 资源类型, 页面URL)
+        pending: Dict[str, tuple] = {}
+        pending_keys: Set[str] = set()
+        for url, resource_type, base_url in download_tasks:
+            if url.startswith('data:'):
+                continue
+            key = _canonical_url(url)
+            if (key in self.downloaded_files or key in pending_keys
+                    or get_domain_from_url(key) != self._start_domain):
+                continue
+            pending_keys.add(key)
+            pending[url] = (key, resource_type, base_url)
+
+        if not pending:
+            return
+
+        fetched = await self._batch_fetch_in_browser(page, list(pending))
+        logger.info("%s[页面内下载] 同源资源 %s/%s 个%s", Fore.CYAN, len(fetched), len(pending), Style.RESET_ALL)
+
+        for url, content in fetched.items():
+            key, resource_type, base_url = pending[url]
+            if not self.downloaded_files.add_new(key):
+                continue
+
+            try:
+                file_path = url_to_filename(key, self.output_dir)
+                # 写文件放到线程中，不阻塞事件循环
+                await asyncio.to_thread(self._write_bytes, file_path, content)
+                await self._record_resource(url, resource_type, file_path, len(content), base_url)
+            except Exception as e:
+                logger.warning("保存资源失败 %s: %s", url[:80], e)
+                self._record_failure({
+                    'url': url,
+                    'type': resource_type,
+                    'error': str(e),
+                    'severity': 'warning'
+                })
+
+    @staticmethod
+    def _write_bytes(file_path: Path, content: bytes) -> None:
+        """创建父目录并写入文件"""
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        with _open_for_write(file_path) as f:
+            f.write(content)
+
     async def _process_css_resources(self, css_file_path: Path, css_url: str) -> None:
         """并发处理CSS文件中引用的资源（图片、字体等）"""
         try:
-            # 读取CSS文件内容
-            with open(css_file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                css_content = f.read()
+            # 读取CSS文件内容（放到线程中，不阻塞事件循环）
+            css_content = await asyncio.to_thread(css_file_path.read_text, encoding='utf-8', errors='ignore')
 
             # 提取所有url()引用
             urls = self._parse_css_urls(css_content, css_url)
@@ -1057,35 +1547,25 @@ class WebsiteDownloader:
             if not urls:
                 return
 
-            logger.info(f"从CSS提取到 {len(urls)} 个资源: {css_url}")
+            logger.info("从CSS提取到 %s 个资源: %s", len(urls), css_url)
 
             # 收集下载任务
             download_tasks = []
-            for url in urls:
-                # 根据文件扩展名判断资源类型
-                ext = url.lower().split('?')[0].split('.')[-1]
-
-                if ext in ['woff', 'woff2', 'ttf', 'eot', 'otf']:
-                    resource_type = 'fonts'
-                elif ext in ['png', 'jpg', 'jpeg', 'gif', 'svg', 'webp', 'ico']:
-                    resource_type = 'images'
-                else:
-                    resource_type = 'other'
+            for url in dict.fromkeys(urls):
+                # 其他页面或 CSS 已下载过的资源不再创建任务
+                if _canonical_url(url) in self.downloaded_files:
+                    continue
 
-                download_tasks.append((url, resource_type))
+                # 根据文件扩展名判断资源类型
+                download_tasks.append((url, self._guess_resource_type(url)))
 
             # 并发下载CSS中的所有资源（注意：不传递base_url避免递归处理）
-            performance_config = self.config.get('performance', {})
-            max_concurrent = performance_config.get('parallel_resource_downloads', 5)
-            semaphore = asyncio.Semaphore(max_concurrent)
-
             async def download_css_resource(url: str, resource_type: str):
-                """带并发限制的CSS资源下载"""
-                async with semaphore:
-                    try:
-                        await self._download_resource(url, resource_type, base_url=None)
-                    except Exception as e:
-                        logger.debug(f"CSS资源下载失败 {url}: {e}")
+                """CSS资源下载（并发数由共享信号量限制）"""
+                try:
+                    await self._download_resource(url, resource_type, base_url=None)
+                except Exception as e:
+                    logger.debug("CSS资源下载失败 %s: %s", url, e)
 
             # 并发执行
             await asyncio.gather(*[
@@ -1094,19 +1574,15 @@ class WebsiteDownloader:
             ], return_exceptions=True)
 
         except Exception as e:
-            logger.warning(f"处理CSS资源失败 {css_url}: {e}")
+            logger.warning("处理CSS资源失败 %s: %s", css_url, e)
 
     def _parse_css_urls(self, css_content: str, base_url: str) -> List[str]:
         """从CSS内容中提取所有url()引用"""
-        import re
         urls = []
 
-        # 匹配 url() 中的所有 URL
-        # 支持格式: url(xxx), url('xxx'), url("xxx")
-        pattern = r'url\s*\(\s*["\']?([^)"\'\s]+)["\']?\s*\)'
-        matches = re.findall(pattern, css_content, re.IGNORECASE)
-
-        for match in matches:
+        # 逐个匹配 url() 中的 URL
+        for url_match in _CSS_URL_RE.finditer(css_content):
+            match = url_match.group(1)
             # 跳过 data URI
             if match.startswith('data:'):
                 continue
@@ -1115,23 +1591,19 @@ class WebsiteDownloader:
             try:
                 full_url = normalize_url(match, base_url)
                 urls.append(full_url)
-                logger.debug(f"从CSS提取URL: {match} -> {full_url}")
+                logger.debug("从CSS提取URL: %s -> %s", match, full_url)
             except Exception as e:
-                logger.warning(f"解析CSS URL失败: {match}, 错误: {e}")
+                logger.warning("解析CSS URL失败: %s, 错误: %s", match, e)
 
         return urls
 
     async def _download_data_uri(self, data_uri: str, resource_type: str) -> None:
         """下载 data URI 格式的资源"""
-        import base64
-        import hashlib
-        import re
-
         try:
             # 解析 data URI: data:[<mediatype>][;base64],<data>
-            match = re.match(r'data:([^;,]+)?(;base64)?,(.+)', data_uri)
+            match = _DATA_URI_RE.match(data_uri)
             if not match:
-                logger.warning(f"无效的 data URI 格式: {data_uri[:100]}")
+                logger.warning("无效的 data URI 格式: %s", data_uri[:100])
                 return
 
             mime_type = match.group(1) or 'application/octet-stream'
@@ -1143,8 +1615,7 @@ class WebsiteDownloader:
                 file_content = base64.b64decode(data)
             else:
                 # URL 解码
-                import urllib.parse
-                file_content = urllib.parse.unquote(data).encode('utf-8')
+                file_content = unquote(data).encode('utf-8')
 
             # 根据 MIME 类型确定文件扩展名
             ext_map = {
@@ -1163,12 +1634,9 @@ class WebsiteDownloader:
             file_hash = hashlib.md5(file_content).hexdigest()[:12]
             filename = f"data_uri_{file_hash}{ext}"
 
-            # 保存文件
+            # 保存文件（写文件放到线程中，不阻塞事件循环）
             file_path = self.output_dir / 'data-uris' / filename
-            file_path.parent.mkdir(parents=True, exist_ok=True)
-
-            with open(file_path, 'wb') as f:
-                f.write(file_content)
+            await asyncio.to_thread(self._write_bytes, file_path, file_content)
 
             # 更新统计
             file_size = len(file_content)
@@ -1176,93 +1644,64 @@ class WebsiteDownloader:
             self.stats['total_size'] += file_size
             self.resource_map[data_uri] = file_path
 
-            logger.debug(f"已保存 data URI {resource_type}: {filename}")
+            logger.debug("已保存 data URI %s: %s", resource_type, filename)
 
         except Exception as e:
-            logger.warning(f"保存 data URI 失败: {e}")
-            self.failed_downloads.append({
+            logger.warning("保存 data URI 失败: %s", e)
+            self._record_failure({
                 'url': 'data-uri',
                 'type': resource_type,
                 'error': str(e)
             })
 
-    def _save_html(self, url: str, html: str) -> Path:
-        """保存 HTML 文件"""
-        file_path = url_to_filename(url, self.output_dir)
+    def _save_html(
+        self,
+        url: str,
+        tree: lxml.html.HtmlElement,
+        rewrites: List[tuple],
+        doctype: Optional[str] = None
+    ) -> Path:
+        """保存 HTML 文件（doctype 为原文档的 DOCTYPE 声明）"""
+        key = _canonical_url(url)
+        file_path = url_to_filename(key, self.output_dir)
         file_path.parent.mkdir(parents=True, exist_ok=True)
 
         # 处理HTML中的资源链接,转换为本地路径
-        html = self._rewrite_html_links(html, url)
+        html = self._rewrite_html_links(tree, key, rewrites, doctype)
 
         with open(file_path, 'w', encoding='utf-8') as f:
             f.write(html)
 
-        self.resource_map[url] = file_path
+        self.resource_map[key] = file_path
         return file_path
 
-    def _rewrite_html_links(self, html: str, base_url: str) -> str:
-        """重写HTML中的链接为本地路径"""
-        soup = BeautifulSoup(html, 'html.parser')
-
-        # 处理CSS链接
-        for tag in soup.find_all('link', href=True):
-            original_url = normalize_url(tag['href'], base_url)
-            if original_url in self.resource_map:
-                tag['href'] = self._get_relative_path(base_url, original_url)
-
-        # 处理JS链接
-        for tag in soup.find_all('script', src=True):
-            original_url = normalize_url(tag['src'], base_url)
-            if original_url in self.resource_map:
-                tag['src'] = self._get_relative_path(base_url, original_url)
-
-        # 处理图片链接
-        for tag in soup.find_all('img', src=True):
-            original_url = normalize_url(tag['src'], base_url)
-            if original_url in self.resource_map:
-                tag['src'] = self._get_relative_path(base_url, original_url)
-
-        # 处理a标签链接
-        for tag in soup.find_all('a', href=True):
-            original_url = normalize_url(tag['href'], base_url)
-            if original_url in self.resource_map:
-                tag['href'] = self._get_relative_path(base_url, original_url)
+    def _rewrite_html_links(
+        self,
+        tree: lxml.html.HtmlElement,
+        base_url: str,
+        rewrites: List[tuple],
+        doctype: Optional[str] = None
+    ) -> str:
+        """把已下载资源的链接（CSS/JS/图片/a 标签）改写为本地路径，返回序列化后的 HTML
+
+        base_url 为页面的规范 URL；原链接带片段（#anchor）时，改写后的本地路径保留该片段。
+        """
+        for tag, attr, original_url in rewrites:
+            key = _canonical_url(original_url)
+            if key not in self.resource_map:
+                continue
+            local_path = self._get_relative_path(base_url, key)
+            if not original_url.startswith('data:'):
+                _, sep, fragment = original_url.partition('#')
+                if sep:
+                    local_path = f"{local_path}#{fragment}"
+            tag.set(attr, local_path)
 
-        return str(soup)
+        return lxml.html.tostring(tree, encoding='unicode', doctype=doctype)
 
     def _get_relative_path(self, from_url: str, to_url: str) -> str:
         """计算相对路径"""
-        from_path = url_to_filename(from_url, self.output_dir)
-        to_path = url_to_filename(to_url, self.output_dir)
-
-        try:
-            rel_path = to_path.relative_to(from_path.parent)
-            return str(rel_path).replace('\\', '/')
-        except ValueError:
-            # 如果无法计算相对路径,返回绝对路径
-            return str(to_path).replace('\\', '/')
-
-    def _extract_links(self, html: str, base_url: str) -> List[str]:
-        """从HTML中提取所有链接"""
-        soup = BeautifulSoup(html, 'html.parser')
-        links = []
-
-        for tag in soup.find_all('a', href=True):
-            url = normalize_url(tag['href'], base_url)
-
-            # 过滤非HTTP链接
-            if not url.startswith(('http://', 'https://')):
-                continue
-
-            # 只提取同域名的链接
-            if not self.config.get('follow_external_links', False):
-                if not is_same_domain(url, self.start_url):
-                    continue
-
-            if url not in self.visited_urls and url not in links:
-                links.append(url)
-
-        return links
+        return _relative_path(self.output_dir, from_url, to_url)
 
     def _generate_report(self) -> Dict:
         """生成下载报告"""
@@ -1294,7 +1733,5 @@ class WebsiteDownloader:
 
 async def download_website(url: str, output_dir: Path, config: Dict) -> Dict:
     """便捷函数: 下载网站"""
-async def download_website(url: str, output_dir: Path, config: Dict) -> Dict:
-    """Download website function"""
     downloader = WebsiteDownloader(url, output_dir, config)
     return await downloader.download()
\ No newline at end of file
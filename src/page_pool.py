@@ -0,0 +1,113 @@
+"""
+页面池模块 - 在同一个浏览器上下文中复用 Playwright 页面
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+import logging
+
+from playwright.async_api import BrowserContext, Page
+
+
+logger = logging.getLogger(__name__)
+
+
+class PagePool:
+    """页面池 - 缓存已创建的 Page，避免每个 URL 都新建和关闭页面
+
+    池中最多同时存在 size 个页面，页面都在使用中时 acquire 会等待其他页面归还。
+    归还的页面先导航到 about:blank 清空状态，重置失败的页面直接关闭，由后续 acquire 补建。
+    """
+
+    def __init__(self, context: BrowserContext, size: int = 8):
+        """
+        Args:
+            context: 创建页面的浏览器上下文
+            size: 池中页面数上限
+        """
+        self.context = context
+        self.size = max(1, size)
+        # 空闲页面；None 表示有页面被丢弃、可以补建一个新页面（用于唤醒等待中的 acquire）
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._created = 0
+
+    async def init(self, count: Optional[int] = None) -> None:
+        """预先并发创建页面放入池中
+
+        Args:
+            count: 预创建的页面数，None 表示创建到 size 个
+        """
+        count = self.size if count is None else min(count, self.size)
+        missing = count - self._created
+        if missing <= 0:
+            return
+
+        self._created += missing
+        results = await asyncio.gather(
+            *[self.context.new_page() for _ in range(missing)],
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                self._created -= 1
+                logger.debug("预创建页面失败: %s", result)
+            else:
+                self._idle.put_nowait(result)
+
+    async def _get(self) -> Page:
+        """取出一个空闲页面；没有空闲页面时在上限内新建，否则等待归还"""
+        while True:
+            if self._idle.empty() and self._created < self.size:
+                self._created += 1
+                try:
+                    return await self.context.new_page()
+                except Exception:
+                    self._created -= 1
+                    raise
+
+            page = await self._idle.get()
+            if page is None:
+                continue
+            if not page.is_closed():
+                return page
+            # 空闲期间被关闭的页面不再复用
+            self._created -= 1
+
+    async def _put(self, page: Page) -> None:
+        """重置页面后放回池中（页面已关闭或重置失败时丢弃）"""
+        if not page.is_closed():
+            try:
+                await page.goto('about:blank')
+                self._idle.put_nowait(page)
+                return
+            except Exception as e:
+                logger.debug("重置页面失败，关闭页面: %s", e)
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+
+        self._created -= 1
+        self._idle.put_nowait(None)
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Page]:
+        """取出一个页面，退出时归还到池中"""
+        page = await self._get()
+        try:
+            yield page
+        finally:
+            await self._put(page)
+
+    async def close(self) -> None:
+        """关闭池中所有空闲页面"""
+        while not self._idle.empty():
+            page = self._idle.get_nowait()
+            if page is None:
+                continue
+            try:
+                await page.close()
+            except Exception as e:
+                logger.debug("关闭页面失败: %s", e)
+        self._created = 0
@@ -6,11 +6,17 @@ import os
 import re
 import json
 import hashlib
+import functools
 from pathlib import Path
 from urllib.parse import urlparse, urljoin
 from typing import Optional, Dict, List
 import logging
 
+try:
+    import orjson  # 可选: C 实现的 JSON 编码器
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 
@@ -41,12 +47,18 @@ def sanitize_filename(filename: str) -> str:
     return filename
 
 
+# URL 辅助函数都是纯函数，缓存结果: 导航菜单、公共样式表等重复出现的 URL 直接命中缓存
+URL_CACHE_SIZE = 100_000
+
+
+@functools.lru_cache(maxsize=URL_CACHE_SIZE)
 def get_domain_from_url(url: str) -> str:
     """从URL中提取域名"""
     parsed = urlparse(url)
     return parsed.netloc
 
 
+@functools.lru_cache(maxsize=URL_CACHE_SIZE)
 def url_to_filename(url: str, base_dir: Path) -> Path:
     """将URL转换为本地文件路径"""
     parsed = urlparse(url)
@@ -66,16 +78,24 @@ def url_to_filename(url: str, base_dir: Path) -> Path:
     return base_dir / parsed.netloc / Path(*parts)
 
 
+@functools.lru_cache(maxsize=URL_CACHE_SIZE)
 def is_same_domain(url1: str, url2: str) -> bool:
     """检查两个URL是否属于同一域名"""
     return get_domain_from_url(url1) == get_domain_from_url(url2)
 
 
+@functools.lru_cache(maxsize=URL_CACHE_SIZE)
 def normalize_url(url: str, base_url: str) -> str:
     """规范化URL,处理相对路径"""
     return urljoin(base_url, url)
 
 
+def clear_url_caches() -> None:
+    """清空 URL 辅助函数的缓存（一次下载结束后释放内存）"""
+    for func in (get_domain_from_url, url_to_filename, is_same_domain, normalize_url):
+        func.cache_clear()
+
+
 def get_file_hash(file_path: Path) -> str:
     """计算文件的MD5哈希值"""
     md5_hash = hashlib.md5()
@@ -88,6 +108,19 @@ def get_file_hash(file_path: Path) -> str:
 def save_json(data: Dict, file_path: Path) -> None:
     """保存数据为JSON文件"""
     file_path.parent.mkdir(parents=True, exist_ok=True)
+
+    if orjson is not None:
+        try:
+            payload = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # orjson 不支持的类型，回退到标准库
+            payload = None
+
+        if payload is not None:
+            with open(file_path, 'wb') as f:
+                f.write(payload)
+            return
+
     with open(file_path, 'w', encoding='utf-8') as f:
         json.dump(data, f, indent=2, ensure_ascii=False)
 
@@ -103,25 +136,22 @@ def load_json(file_path: Path) -> Optional[Dict]:
 
 def extract_links_from_html(html: str, base_url: str) -> List[str]:
     """从HTML中提取所有链接"""
-    from bs4 import BeautifulSoup
+    from bs4 import BeautifulSoup, SoupStrainer
 
-    soup = BeautifulSoup(html, 'html.parser')
-    links = []
+    # 解析时只保留带 href 的 <a> 标签，其余节点直接丢弃
+    soup = BeautifulSoup(html, 'lxml', parse_only=SoupStrainer('a', href=True))
 
-    # 提取 <a> 标签的链接
-    for tag in soup.find_all('a', href=True):
-        url = normalize_url(tag['href'], base_url)
-        if url not in links:
-            links.append(url)
+    # 提取 <a> 标签的链接（去重并保持出现顺序）
+    links = dict.fromkeys(normalize_url(tag['href'], base_url) for tag in soup.find_all('a', href=True))
 
-    return links
+    return list(links)
 
 
 def extract_resources_from_html(html: str, base_url: str) -> Dict[str, List[str]]:
     """从HTML中提取所有资源链接"""
     from bs4 import BeautifulSoup
 
-    soup = BeautifulSoup(html, 'html.parser')
+    soup = BeautifulSoup(html, 'lxml')
     resources = {
         'css': [],
         'js': [],
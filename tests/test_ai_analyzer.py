@@ -0,0 +1,115 @@
+"""
+AI 分析模块测试
+"""
+
+import pytest
+
+from src.ai_analyzer import AIAnalyzer
+
+
+def _legacy_extract_suggestions(text: str) -> list:
+    """原先逐行扫描的实现（_BULLET_RE 应与其结果完全一致）"""
+    suggestions = []
+    for line in text.split('\n'):
+        line = line.strip()
+        if line and (line[0].isdigit() or line.startswith('-') or line.startswith('•')):
+            suggestions.append(line.lstrip('0123456789.-• '))
+    return suggestions
+
+
+@pytest.fixture
+def analyzer(tmp_path):
+    return AIAnalyzer({'cache_dir': str(tmp_path)})
+
+
+@pytest.mark.parametrize('text', [
+    "1.优化图片\n-使用CDN\n3. 启用 gzip",
+    "## 建议\n1. 代码分割\n2) 懒加载\n   - 子项\n• 圆点\n普通段落",
+    "  - 行尾空白  \r\n- CRLF 换行\r\n",
+    "---\n-\n1.\n\n2024年计划\n1.2.3 版本号",
+    "１．全角数字\n1.\t制表符\n　- 全角空格缩进",
+    "",
+])
+def test_extract_suggestions_matches_legacy_loop(analyzer, text):
+    """列表项提取结果与原先的逐行实现一致（包括标记后没有空格的条目）"""
+    assert analyzer._extract_suggestions(text) == _legacy_extract_suggestions(text)
+
+
+def test_extract_suggestions_without_space_after_marker(analyzer):
+    assert analyzer._extract_suggestions("1.优化图片\n-使用CDN\n3. 启用 gzip") == [
+        '优化图片', '使用CDN', '启用 gzip'
+    ]
+
+
+def _reports(output_directory='/tmp/out/site_1'):
+    """构造最小的下载/技术栈/项目报告"""
+    download_report = {
+        'statistics': {
+            'pages_downloaded': 3, 'css_files': 2, 'js_files': 1,
+            'images': 4, 'total_size': '1.2 MB'
+        },
+        'output_directory': output_directory,
+    }
+    tech_report = {'detected_technologies': {'frameworks': ['React']}}
+    project_report = {'project_type': 'react'}
+    return download_report, tech_report, project_report
+
+
+async def test_missing_cli_result_is_marked_as_fallback(tmp_path):
+    """Claude CLI 不可用时返回本地模板结果，标记 fallback 且可信度为 low"""
+    analyzer = AIAnalyzer({
+        'cache_dir': str(tmp_path),
+        'enable_cache': False,
+        'claude_bin': 'claude-cli-that-does-not-exist',
+    })
+    report = await analyzer.analyze_async(*_reports())
+
+    assert report['analysis']['fallback'] is True
+    assert report['confidence'] == 'low'
+    assert report['analysis']['suggestions']
+
+
+async def test_fallback_result_is_not_cached(tmp_path):
+    """本地模板结果不写入缓存，下次仍会重新尝试调用 Claude CLI"""
+    analyzer = AIAnalyzer({'cache_dir': str(tmp_path), 'claude_bin': 'claude-cli-that-does-not-exist'})
+    await analyzer.analyze_async(*_reports())
+
+    assert list(tmp_path.iterdir()) == []
+
+
+async def test_cache_hit_ignores_per_run_fields(tmp_path, monkeypatch):
+    """输出目录不同的两次复刻命中同一条缓存"""
+    analyzer = AIAnalyzer({'cache_dir': str(tmp_path)})
+    calls = []
+
+    async def fake_cli(context):
+        calls.append(context)
+        return {'raw_response': '1. 建议', 'suggestions': ['建议'], 'summary': '1. 建议'}
+
+    monkeypatch.setattr(analyzer, '_call_local_claude_analysis_async', fake_cli)
+
+    first = await analyzer.analyze_async(*_reports('/tmp/out/site_20260101_000000'))
+    second = await analyzer.analyze_async(*_reports('/tmp/out/site_20260102_000000'))
+
+    assert len(calls) == 1
+    assert second == first
+    assert first['confidence'] == 'high'
+
+
+async def test_corrupt_cache_file_is_a_miss(tmp_path, monkeypatch):
+    """损坏的缓存文件视为未命中，重新分析后被覆盖"""
+    analyzer = AIAnalyzer({'cache_dir': str(tmp_path)})
+
+    async def fake_cli(context):
+        return {'raw_response': '', 'suggestions': ['建议'], 'summary': ''}
+
+    monkeypatch.setattr(analyzer, '_call_local_claude_analysis_async', fake_cli)
+
+    reports = _reports()
+    cache_path = tmp_path / f"{analyzer._compute_cache_key(analyzer._prepare_analysis_context(*reports))}.json"
+    cache_path.write_text('{"ai_enabled": tr', encoding='utf-8')
+
+    report = await analyzer.analyze_async(*reports)
+
+    assert report['analysis']['suggestions'] == ['建议']
+    assert analyzer._read_cache(cache_path) == report
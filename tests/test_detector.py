@@ -0,0 +1,154 @@
+"""
+技术栈检测模块测试
+"""
+
+import pytest
+
+import src.detector as detector_module
+from src.detector import TechStackDetector, _DetectionCache
+
+
+@pytest.fixture
+def site_dir(tmp_path):
+    """构造一个包含 HTML/JS/CSS 文件的下载目录"""
+    site = tmp_path / 'site'
+    pages = site / 'example.com'
+    pages.mkdir(parents=True)
+
+    (pages / 'index.html').write_text(
+        '<html><body><div id="__next" data-reactroot="">x</div>'
+        '<script>window.__NEXT_DATA__={}</script>'
+        '<div class="container btn btn-primary"></div></body></html>',
+        encoding='utf-8'
+    )
+    for i in range(3):
+        (pages / f'page{i}.html').write_text(
+            f'<html><body><div data-v-123>{i}</div></body></html>', encoding='utf-8'
+        )
+    (pages / 'app.js').write_text(
+        'var x = React.createElement("div"); jQuery.fn.x = 1; webpackJsonp;', encoding='utf-8'
+    )
+    (pages / 'site.css').write_text('.ant-btn{} --tw-ring-color: red;', encoding='utf-8')
+    return site
+
+
+@pytest.fixture
+def cache_path(tmp_path, monkeypatch):
+    """检测缓存写到临时目录"""
+    path = tmp_path / 'detector_cache.db'
+    monkeypatch.setattr(detector_module, 'DETECTION_CACHE_PATH', path)
+    return path
+
+
+@pytest.fixture
+def analyzed_jobs(monkeypatch):
+    """记录每次检测中实际分析（未命中缓存）的文件"""
+    calls = []
+    analyze = TechStackDetector._analyze_files_locally
+
+    def spy(self, jobs):
+        calls.append(sorted(job[1] for job in jobs))
+        return analyze(self, jobs)
+
+    monkeypatch.setattr(TechStackDetector, '_analyze_files_locally', spy)
+    return calls
+
+
+def _detect(directory):
+    return TechStackDetector().detect_from_directory(directory)
+
+
+def test_detection_cache_miss_then_hit(site_dir, cache_path, analyzed_jobs):
+    """首次检测分析全部文件；文件未变化时再次检测全部命中缓存，结果一致"""
+    first = _detect(site_dir)
+    second = _detect(site_dir)
+
+    assert first['detected_technologies']
+    assert second == first
+    assert len(analyzed_jobs[0]) == 6
+    # 第二次检测时全部文件命中缓存，没有需要分析的文件
+    assert analyzed_jobs[1] == []
+
+
+def test_detection_cache_misses_changed_file(site_dir, cache_path, analyzed_jobs):
+    """文件内容（大小）变化后该文件不再命中缓存"""
+    _detect(site_dir)
+
+    changed = site_dir / 'example.com' / 'page0.html'
+    changed.write_text('<html><body><p>changed content</p></body></html>', encoding='utf-8')
+    _detect(site_dir)
+
+    assert analyzed_jobs[-1] == [str(changed)]
+
+
+def test_detection_cache_invalidated_when_rules_change(site_dir, cache_path, analyzed_jobs, monkeypatch):
+    """检测规则哈希变化时清空缓存，全部文件重新分析"""
+    first = _detect(site_dir)
+
+    monkeypatch.setattr(TechStackDetector, '_rules_hash', staticmethod(lambda: 'changed-rules'))
+    second = _detect(site_dir)
+
+    assert second == first
+    assert analyzed_jobs[-1] == analyzed_jobs[0]
+
+
+def test_detection_cache_rows_cleared_on_rules_hash_change(tmp_path):
+    """直接验证: 以不同规则哈希重新打开缓存后，旧记录不可见"""
+    target = tmp_path / 'file.js'
+    target.write_text('x', encoding='utf-8')
+    path = tmp_path / 'cache.db'
+
+    cache = _DetectionCache.open(path, 'rules-a')
+    cache.store([(str(target), (0b101, 0b111))])
+    cache.close()
+
+    cache = _DetectionCache.open(path, 'rules-a')
+    assert cache.lookup(str(target)) == (0b101, 0b111)
+    cache.close()
+
+    cache = _DetectionCache.open(path, 'rules-b')
+    assert cache.lookup(str(target)) is None
+    cache.close()
+
+
+def test_cached_result_not_used_for_unchecked_technologies(site_dir, cache_path):
+    """缓存记录只检查过部分技术时，仍有未检查的技术待检测则该文件需要重新分析"""
+    html = str(site_dir / 'example.com' / 'index.html')
+    detector = TechStackDetector()
+    html_mask = detector._kind_masks['html']
+
+    cache = _DetectionCache.open(cache_path, detector._rules_hash())
+    # 只检查过最低位对应的技术
+    cache.store([(html, (0, 1))])
+    try:
+        remaining = detector._apply_cached_results(cache, [('html', html, None)])
+        assert remaining == [('html', html, None)]
+
+        # 检查过全部 HTML 技术位时可直接使用缓存结果
+        cache.store([(html, (0, html_mask))])
+        assert detector._apply_cached_results(cache, [('html', html, None)]) == []
+    finally:
+        cache.close()
+
+
+def test_process_pool_matches_local_analysis(site_dir, monkeypatch):
+    """多进程分析与当前进程分析得到相同的检测结果"""
+    monkeypatch.setattr(detector_module, 'DETECTION_CACHE_PATH', None)
+
+    monkeypatch.setattr(detector_module, 'ANALYZE_WORKERS', 1)
+    local = _detect(site_dir)
+
+    used_processes = []
+    in_processes = TechStackDetector._analyze_files_in_processes
+
+    def spy(self, jobs):
+        used_processes.append(len(jobs))
+        return in_processes(self, jobs)
+
+    monkeypatch.setattr(TechStackDetector, '_analyze_files_in_processes', spy)
+    monkeypatch.setattr(detector_module, 'ANALYZE_WORKERS', 2)
+    monkeypatch.setattr(detector_module, 'PROCESS_POOL_MIN_FILES', 1)
+    pooled = _detect(site_dir)
+
+    assert used_processes == [6]
+    assert pooled == local
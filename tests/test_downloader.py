@@ -0,0 +1,88 @@
+"""
+网站下载器测试
+"""
+
+import socket
+
+import pytest
+from aiohttp import web
+
+import src.downloader as downloader_module
+from src.downloader import WebsiteDownloader
+
+IMAGE_BYTES = b'\x89PNG' + b'0123456789' * 1000
+ETAG = '"img-v1"'
+
+# 测试中不启动线程/内存监控
+TEST_CONFIG = {
+    'thread': {'enable_monitoring': False},
+    'memory': {'enable_monitoring': False},
+}
+
+
+@pytest.fixture
+def unused_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def resource_server():
+    """支持 ETag 条件请求的资源服务器，记录每次响应的状态码"""
+    statuses = []
+
+    async def image(request):
+        if request.headers.get('If-None-Match') == ETAG:
+            statuses.append(304)
+            return web.Response(status=304, headers={'ETag': ETAG})
+        statuses.append(200)
+        return web.Response(body=IMAGE_BYTES, content_type='image/png', headers={'ETag': ETAG})
+
+    app = web.Application()
+    app.router.add_get('/img/logo.png', image)
+    return app, statuses
+
+
+@pytest.fixture(autouse=True)
+def isolated_downloader(tmp_path, monkeypatch):
+    """资源缓存写到临时目录，并且不注册进程级的信号/退出处理函数"""
+    monkeypatch.setattr(downloader_module, 'CACHE_DIR', tmp_path / 'cache')
+    monkeypatch.setattr(WebsiteDownloader, '_register_cleanup_handlers', lambda self: None)
+
+
+async def _download_once(base_url: str, output_dir):
+    downloader = WebsiteDownloader(base_url, output_dir, TEST_CONFIG)
+    try:
+        await downloader._download_resource(f'{base_url}img/logo.png', 'images', None)
+    finally:
+        await downloader._close_http_session()
+        downloader._save_cache_index()
+    return downloader
+
+
+async def test_resource_restored_from_cache_on_304(tmp_path, resource_server, unused_port):
+    """再次复刻到新的输出目录时发送条件请求，304 响应从缓存恢复文件"""
+    app, statuses = resource_server
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', unused_port)
+    await site.start()
+    base_url = f'http://127.0.0.1:{unused_port}/'
+
+    try:
+        first = await _download_once(base_url, tmp_path / 'run1')
+        second = await _download_once(base_url, tmp_path / 'run2')
+    finally:
+        await runner.cleanup()
+
+    assert statuses == [200, 304]
+
+    restored = tmp_path / 'run2' / f'127.0.0.1:{unused_port}' / 'img' / 'logo.png'
+    assert restored.read_bytes() == IMAGE_BYTES
+    assert first.stats['images'] == second.stats['images'] == 1
+    assert second.stats['total_size'] == len(IMAGE_BYTES)
+    assert not second.failed_downloads
+
+    # 缓存不写入网站输出目录
+    assert not (tmp_path / 'run2' / '.cache').exists()
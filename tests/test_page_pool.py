@@ -0,0 +1,77 @@
+"""
+页面池测试
+"""
+
+import asyncio
+
+from src.page_pool import PagePool
+
+
+class FakePage:
+    def __init__(self):
+        self.closed = False
+        self.visited = []
+
+    def is_closed(self) -> bool:
+        return self.closed
+
+    async def goto(self, url: str) -> None:
+        self.visited.append(url)
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class FakeContext:
+    def __init__(self):
+        self.pages = []
+
+    async def new_page(self) -> FakePage:
+        page = FakePage()
+        self.pages.append(page)
+        return page
+
+
+async def test_pages_are_reused_and_reset():
+    """归还的页面重置到 about:blank 后被下一次 acquire 复用"""
+    context = FakeContext()
+    pool = PagePool(context, size=2)
+
+    async with pool.acquire() as first:
+        pass
+    async with pool.acquire() as second:
+        pass
+
+    assert second is first
+    assert len(context.pages) == 1
+    assert first.visited == ['about:blank', 'about:blank']
+
+
+async def test_acquire_waits_when_pool_is_full():
+    """页面数达到上限时 acquire 等待其他页面归还，不会多建页面"""
+    context = FakeContext()
+    pool = PagePool(context, size=1)
+
+    async with pool.acquire() as page:
+        waiter = asyncio.create_task(pool._get())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+    assert await waiter is page
+    assert len(context.pages) == 1
+
+
+async def test_closed_page_is_replaced():
+    """使用中被关闭的页面不放回池中，下次 acquire 新建页面"""
+    context = FakeContext()
+    pool = PagePool(context, size=1)
+
+    async with pool.acquire() as page:
+        page.closed = True
+
+    async with pool.acquire() as replacement:
+        assert replacement is not page
+
+    assert len(context.pages) == 2
+    await pool.close()
+    assert replacement.closed